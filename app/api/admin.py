@@ -0,0 +1,51 @@
+import asyncio
+import hmac
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core import profiling
+from app.core.memory import worker_report
+
+async def require_admin(x_admin_token: str = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+async def require_profiling():
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/memory")
+async def memory_report():
+    """RSS/PSS breakdown and thread counts for the worker serving this request"""
+    return worker_report()
+
+@router.post("/profile", dependencies=[Depends(require_profiling)])
+async def capture_profile(seconds: float = Query(10, gt=0)):
+    """Sample the live process for `seconds` and store the result"""
+    if seconds > settings.PROFILING_MAX_CAPTURE_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Capture is limited to {settings.PROFILING_MAX_CAPTURE_SECONDS} seconds"
+        )
+    profile = await asyncio.to_thread(profiling.capture_profile, seconds)
+    return {k: v for k, v in profile.items() if k != "stacks"}
+
+@router.get("/profiles", dependencies=[Depends(require_profiling)])
+async def list_profiles():
+    """List stored profiles, newest first"""
+    return profiling.list_profiles()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_profiling)])
+async def download_profile(profile_id: int):
+    """Download a profile in folded-stack format"""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profiling.render_folded(profile),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
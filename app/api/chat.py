@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from uuid import uuid4
+from app.schemas.chat import ChatCreate, ChatMessageAppend, ChatMessagePage
+from app.db.queries.chat_queries import create_chat, get_chat
+from app.services.chat import append_messages, read_messages
+
+router = APIRouter()
+
+@router.post("")
+async def create_chat_route(chat: ChatCreate):
+    """Create an empty chat"""
+    try:
+        return await create_chat(chat.id or str(uuid4()), chat.user_id, chat.title)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{chat_id}")
+async def get_chat_route(chat_id: str):
+    """Get chat metadata"""
+    chat = await get_chat(chat_id)
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return chat
+
+@router.post("/{chat_id}/messages")
+async def append_messages_route(chat_id: str, batch: ChatMessageAppend):
+    """Append a batch of messages to a chat in a single insert"""
+    try:
+        inserted = await append_messages(chat_id, batch.messages)
+        return {"inserted": len(inserted), "messages": inserted}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{chat_id}/messages", response_model=ChatMessagePage)
+async def read_messages_route(
+    chat_id: str,
+    limit: int = Query(50, ge=1),
+    before: Optional[str] = None
+):
+    """Read the last `limit` messages, or the page older than the `before` cursor"""
+    try:
+        return await read_messages(chat_id, limit, before)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,16 +1,71 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
-from sentence_transformers import SentenceTransformer
-from app.schemas.encode import EncodeRequest, EncodeResponse
+from app.schemas.encode import EncodeRequest, EncodeResponse, EncodeBatchRequest, EncodeBatchResponse
 from app.core.config import settings
+from app.core.metrics import ENCODE_BATCH_SIZE, ENCODE_DURATION, observe, timed
+from app.services.encoding import encode_long_texts
+from app.services.model_registry import registry
 
 router = APIRouter()
-model = SentenceTransformer(settings.EMBEDDING_MODEL)
+registry.get()  # Load the default model at import so the first request is warm
+
+async def resolve_model(name: str = None):
+    """Return (name, model), loading a cold model off the event loop"""
+    try:
+        name = registry.resolve(name)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    if registry.is_loaded(name):
+        return name, registry.get(name)
+    return name, await asyncio.to_thread(registry.get, name)
+
+def encode_one(model, name: str, request: EncodeRequest) -> dict:
+    if request.long_text:
+        return encode_long_texts(model, [request.text], request.pooling, model_name=name)[0]
+    observe(ENCODE_BATCH_SIZE, 1, model=name)
+    with timed(ENCODE_DURATION, model=name):
+        return {"embedding": model.encode(request.text).tolist()}
+
+def encode_many(model, name: str, request: EncodeBatchRequest) -> dict:
+    if request.long_text:
+        results = encode_long_texts(model, request.texts, request.pooling, model_name=name)
+        return {
+            "embeddings": [result["embedding"] for result in results],
+            "token_counts": [result["token_count"] for result in results],
+            "chunks": [result["chunks"] for result in results],
+        }
+    observe(ENCODE_BATCH_SIZE, len(request.texts), model=name)
+    with timed(ENCODE_DURATION, model=name):
+        return {"embeddings": model.encode(request.texts, batch_size=settings.ENCODE_BATCH_SIZE).tolist()}
+
+@router.get("/models")
+async def list_models():
+    """List encodable models and which ones are resident"""
+    return registry.describe()
 
 @router.post("/text", response_model=EncodeResponse)
 async def generate_embedding(request: EncodeRequest):
     """Generate text embedding using sentence transformer model"""
+    name, model = await resolve_model(request.model)
+    try:
+        # Off the event loop, so other requests keep being served and the
+        # admission gate's slot stays held until the encode actually finishes
+        result = await asyncio.to_thread(encode_one, model, name, request)
+        return {**result, "model": name, "dimension": len(result["embedding"])}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/texts", response_model=EncodeBatchResponse)
+async def generate_embeddings(request: EncodeBatchRequest):
+    """Generate embeddings for a batch of texts, bucketed by length to minimise padding"""
+    if len(request.texts) > settings.ENCODE_MAX_BATCH_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ENCODE_MAX_BATCH_TEXTS} texts can be encoded per request"
+        )
+    name, model = await resolve_model(request.model)
     try:
-        embedding = model.encode(request.text).tolist()
-        return {"embedding": embedding}
+        response = await asyncio.to_thread(encode_many, model, name, request)
+        return {**response, "model": name, "dimension": len(response["embeddings"][0])}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.core.config import settings
+from app.services.facets import job_facets, task_summary
+
+router = APIRouter()
+
+@router.get("/facets")
+async def get_facets(limit: int = Query(20, ge=1, le=settings.FACETS_MAX_VALUES)):
+    """Job counts by location and job type, and annualised salary histograms per currency"""
+    return await job_facets(limit)
+
+@router.get("/tasks/{task_id}/summary")
+async def get_task_summary(task_id: str):
+    """Aggregate counts for the jobs produced by one scraping task"""
+    summary = await task_summary(task_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return summary
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from app.core import metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """Expose Prometheus metrics"""
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    payload, content_type = metrics.render_metrics()
+    return Response(content=payload, media_type=content_type)
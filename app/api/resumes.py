@@ -0,0 +1,73 @@
+import asyncio
+import os
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.core.config import settings
+from app.db.queries.resume_queries import create_pending_resume, get_resume, reclaim_resume_parse
+from app.services.resume_parser import schedule_parse
+from app.services.uploads import UploadError, UploadTooLarge, receive_upload
+
+RESUME_FILE_TYPES = ("pdf", "docx", "txt")
+
+router = APIRouter()
+
+@router.post("", status_code=201)
+async def upload_resume(request: Request, response: Response):
+    """
+    Upload a resume as multipart/form-data with a `file` part plus `user_id` and
+    optional `title` fields. The file is streamed to disk and parsed in the
+    background; the resume is returned as 'pending' and becomes 'active' once
+    parsed. Re-uploading the same file returns the existing resume (200).
+    """
+    try:
+        upload = await receive_upload(
+            request,
+            settings.RESUME_UPLOAD_DIR,
+            settings.RESUME_MAX_UPLOAD_MB * 1024 * 1024,
+            allowed_extensions=RESUME_FILE_TYPES
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    user_id = upload["fields"].get("user_id")
+    if not user_id:
+        os.unlink(upload["path"])
+        raise HTTPException(status_code=400, detail="Missing user_id field")
+
+    # Content-addressed, so a retried upload lands on the same file
+    file_path = str(Path(settings.RESUME_UPLOAD_DIR) / f"{upload['sha256']}.{upload['extension']}")
+    try:
+        resume, created = await create_pending_resume(
+            user_id,
+            upload["fields"].get("title") or Path(upload["filename"]).stem,
+            file_path,
+            upload["extension"],
+            upload["sha256"]
+        )
+    except ValueError as e:
+        os.unlink(upload["path"])
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception:
+        os.unlink(upload["path"])
+        raise
+    await asyncio.to_thread(os.replace, upload["path"], file_path)
+
+    if created:
+        schedule_parse(resume["id"], file_path, upload["extension"])
+    else:
+        response.status_code = 200
+        # A retry of a failed parse, or of one whose lease expired without a result
+        if resume["status"] == "pending" and await reclaim_resume_parse(resume["id"], settings.RESUME_PARSE_LEASE_SECONDS):
+            schedule_parse(resume["id"], resume["file_path"], resume["file_type"])
+            resume = {**resume, "parse_error": None}
+    return resume
+
+@router.get("/{resume_id}")
+async def get_resume_route(resume_id: int):
+    """Get a resume, including its parse status"""
+    resume = await get_resume(resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
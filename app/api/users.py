@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.schemas.auth import UserSignup
 from app.services.auth import verify_token
-from app.db.queries.auth_queries import get_user, get_user_by_email
+from app.db.queries.auth_queries import get_user_profile as load_user_profile, get_user_by_email
+from app.services.user_cache import cached_profile
 from app.core.security import oauth2_scheme
 
 router = APIRouter()
@@ -21,7 +22,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 async def get_user_profile(username: str):
     """Get user profile by username"""
     try:
-        user = await get_user(username)
+        user = await cached_profile("username", username, load_user_profile)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return {
@@ -29,6 +30,8 @@ async def get_user_profile(username: str):
             "email": user["email"],
             "name": user["name"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -36,7 +39,7 @@ async def get_user_profile(username: str):
 async def get_user_by_email_route(email: str):
     """Get user by email"""
     try:
-        user = await get_user_by_email(email)
+        user = await cached_profile("email", email, get_user_by_email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return {
@@ -44,5 +47,7 @@ async def get_user_by_email_route(email: str):
             "email": user["email"],
             "name": user["name"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
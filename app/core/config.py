@@ -20,22 +20,89 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     DATABASE_MIN_CONNECTIONS: int = int(os.getenv("DATABASE_MIN_CONNECTIONS", "1"))
     DATABASE_MAX_CONNECTIONS: int = int(os.getenv("DATABASE_MAX_CONNECTIONS", "10"))
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")  # comma-separated read replica DSNs
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5"))
+    DATABASE_REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv("DATABASE_REPLICA_LAG_CHECK_SECONDS", "2"))  # how long a lag reading is trusted
+    
+    SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY")
+    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+    USER_CACHE_NEGATIVE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_NEGATIVE_TTL_SECONDS", "30"))  # for unknown usernames/emails
     
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY")
     PINECONE_INDEX_NAME: str = os.getenv("PINECONE_INDEX_NAME")
     PINECONE_ENVIRONMENT: str = os.getenv("PINECONE_ENVIRONMENT")
+    VECTOR_STORE: str = os.getenv("VECTOR_STORE", "pinecone")  # "pinecone" or "local"
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", "vector_store")  # directory used by the local store
+    VECTOR_UPSERT_BATCH_SIZE: int = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))  # vectors per upsert call
+    VECTOR_OUTBOX_BATCH_SIZE: int = int(os.getenv("VECTOR_OUTBOX_BATCH_SIZE", "1000"))  # outbox rows claimed per drain
+    VECTOR_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("VECTOR_OUTBOX_MAX_ATTEMPTS", "10"))
+    VECTOR_OUTBOX_RETRY_SECONDS: float = float(os.getenv("VECTOR_OUTBOX_RETRY_SECONDS", "5"))  # doubled per attempt
+    VECTOR_OUTBOX_LEASE_SECONDS: float = float(os.getenv("VECTOR_OUTBOX_LEASE_SECONDS", "300"))  # claimed rows are retried after this if never acked
     
     CELERY_BROKER_URL: Optional[str] = os.getenv("CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND: Optional[str] = os.getenv("CELERY_RESULT_BACKEND")
     CELERY_TASK_TRACK_STARTED: bool = True
     CELERY_TASK_TIME_LIMIT: int = int(os.getenv("CELERY_TASK_TIME_LIMIT", "1800"))  # 30 minutes
     
+    TASK_WRITER_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("TASK_WRITER_FLUSH_INTERVAL_SECONDS", "1.0"))
+    TASK_WRITER_BATCH_SIZE: int = int(os.getenv("TASK_WRITER_BATCH_SIZE", "500"))  # log lines that trigger an early flush
+    TASK_WRITER_MAX_BUFFER: int = int(os.getenv("TASK_WRITER_MAX_BUFFER", "10000"))
+    
     MAX_JOBS_PER_SITE: int = int(os.getenv("MAX_JOBS_PER_SITE", "20"))
     SCRAPING_TIMEOUT: int = int(os.getenv("SCRAPING_TIMEOUT", "30"))
     USER_AGENT: str = os.getenv("USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
     
-    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")  # default model
+    EMBEDDING_MODELS: str = os.getenv("EMBEDDING_MODELS", "")  # extra loadable models: "alias=org/model,org/other"
+    EMBEDDING_MODELS_RAM_BUDGET_MB: int = int(os.getenv("EMBEDDING_MODELS_RAM_BUDGET_MB", "2048"))
+    ENCODE_BATCH_SIZE: int = int(os.getenv("ENCODE_BATCH_SIZE", "32"))
+    ENCODE_MAX_BATCH_TEXTS: int = int(os.getenv("ENCODE_MAX_BATCH_TEXTS", "64"))
+    ENCODE_WINDOW_OVERLAP: int = int(os.getenv("ENCODE_WINDOW_OVERLAP", "32"))  # tokens shared by adjacent windows
+    
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # estimated Jaccard similarity
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))  # words per description shingle
+    
+    CHAT_CACHE_WINDOW: int = int(os.getenv("CHAT_CACHE_WINDOW", "50"))  # messages kept hot per chat
+    CHAT_CACHE_TTL_SECONDS: int = int(os.getenv("CHAT_CACHE_TTL_SECONDS", "900"))
+    CHAT_MAX_PAGE_SIZE: int = int(os.getenv("CHAT_MAX_PAGE_SIZE", "200"))
+    CHAT_MAX_APPEND_BATCH: int = int(os.getenv("CHAT_MAX_APPEND_BATCH", "100"))
+    
+    RESUME_UPLOAD_DIR: str = os.getenv("RESUME_UPLOAD_DIR", "uploads/resumes")
+    RESUME_MAX_UPLOAD_MB: int = int(os.getenv("RESUME_MAX_UPLOAD_MB", "10"))
+    RESUME_PARSE_WORKERS: int = int(os.getenv("RESUME_PARSE_WORKERS", "2"))  # parser processes per API worker
+    RESUME_PARSE_LEASE_SECONDS: float = float(os.getenv("RESUME_PARSE_LEASE_SECONDS", "300"))  # after this a pending parse is presumed lost
+    
+    FACETS_CACHE_TTL_SECONDS: float = float(os.getenv("FACETS_CACHE_TTL_SECONDS", "30"))
+    FACETS_MAX_VALUES: int = int(os.getenv("FACETS_MAX_VALUES", "100"))  # cap on ?limit for location/job_type facets
+    
+    # Token buckets: sustained requests per second and burst size, per client per route
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DEFAULT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_DEFAULT_PER_SECOND", "20"))
+    RATE_LIMIT_DEFAULT_BURST: int = int(os.getenv("RATE_LIMIT_DEFAULT_BURST", "40"))
+    RATE_LIMIT_ENCODE_PER_SECOND: float = float(os.getenv("RATE_LIMIT_ENCODE_PER_SECOND", "5"))
+    RATE_LIMIT_ENCODE_BURST: int = int(os.getenv("RATE_LIMIT_ENCODE_BURST", "10"))
+    RATE_LIMIT_TASK_PER_SECOND: float = float(os.getenv("RATE_LIMIT_TASK_PER_SECOND", "0.2"))
+    RATE_LIMIT_TASK_BURST: int = int(os.getenv("RATE_LIMIT_TASK_BURST", "3"))
+    RATE_LIMIT_REDIS_RETRY_SECONDS: int = int(os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "30"))
+    RATE_LIMIT_TRUSTED_PROXIES: str = os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "")  # comma-separated proxy IPs whose X-Forwarded-For is honoured
+    
+    # Admission control for the encoder: requests beyond in-flight + queue are shed with 503
+    ENCODE_MAX_IN_FLIGHT: int = int(os.getenv("ENCODE_MAX_IN_FLIGHT", "4"))
+    ENCODE_MAX_QUEUE: int = int(os.getenv("ENCODE_MAX_QUEUE", "16"))
+    ENCODE_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ENCODE_QUEUE_TIMEOUT_SECONDS", "2"))
+    
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SLOW_REQUEST_SECONDS: float = float(os.getenv("PROFILING_SLOW_REQUEST_SECONDS", "1.0"))
+    PROFILING_SAMPLE_INTERVAL_MS: int = int(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "20"))
+    PROFILING_MAX_CAPTURE_SECONDS: int = int(os.getenv("PROFILING_MAX_CAPTURE_SECONDS", "60"))
+    PROFILING_MAX_STACKS: int = int(os.getenv("PROFILING_MAX_STACKS", "2000"))  # distinct folded stacks kept in memory
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")  # Required for /api/admin endpoints
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -79,6 +146,14 @@ class Settings(BaseSettings):
             "maxconn": self.DATABASE_MAX_CONNECTIONS
         }
 
+    @property
+    def replica_database_configs(self) -> list:
+        """Pool configuration for each read replica"""
+        return [
+            {"dsn": dsn, "minconn": max(1, self.DATABASE_MIN_CONNECTIONS), "maxconn": self.DATABASE_MAX_CONNECTIONS}
+            for dsn in filter(None, (url.strip() for url in self.DATABASE_REPLICA_URLS.split(",")))
+        ]
+
 @lru_cache()
 def get_settings() -> Settings:
     """
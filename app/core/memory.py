@@ -0,0 +1,45 @@
+import os
+import threading
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+def process_memory(pid: int = None) -> dict:
+    """
+    Memory breakdown for a process in MB, from /proc/<pid>/smaps_rollup (Linux).
+    RSS counts pages shared with the master and sibling workers in full; PSS
+    splits them between sharers, so summing PSS across workers gives the real
+    total, and Shared_* shows how much of the preloaded model is still shared.
+    """
+    pid = pid or os.getpid()
+    report = {"pid": pid}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    report[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        import resource
+        report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+def child_pids(pid: int) -> list:
+    """Direct children of `pid`, e.g. the workers of a gunicorn master"""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+def worker_report() -> dict:
+    report = process_memory()
+    try:
+        import torch
+        report["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    report["python_threads"] = threading.active_count()
+    return report
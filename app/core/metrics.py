@@ -0,0 +1,164 @@
+"""
+Prometheus metrics for the API, database, encoder and Celery publishing.
+
+Everything here is gated on METRICS_ENABLED. When it is off, decorators return
+the wrapped function untouched, timers are a shared no-op context manager and
+the middleware is never installed, so the hot paths pay nothing for it.
+When several worker processes serve the app, set PROMETHEUS_MULTIPROC_DIR and
+/metrics aggregates across them.
+"""
+import asyncio
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from app.core.config import settings
+
+ENABLED = settings.METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop monitor was due to wake and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+ENCODE_BATCH_SIZE = Histogram(
+    "encode_batch_size",
+    "Number of texts passed to a single model.encode call",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+ENCODE_DURATION = Histogram(
+    "encode_duration_seconds",
+    "Wall time of a single model.encode call",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent checking a connection out of the pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of each named query, including connection checkout",
+    ["query"],
+    buckets=LATENCY_BUCKETS,
+)
+CELERY_PUBLISH_DURATION = Histogram(
+    "celery_publish_duration_seconds",
+    "Time to publish a task message to the broker",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+VECTOR_UPSERT_DURATION = Histogram(
+    "vector_upsert_duration_seconds",
+    "Duration of one batched upsert call to the vector store",
+    buckets=LATENCY_BUCKETS,
+)
+
+_noop = nullcontext()
+
+@contextmanager
+def _timer(histogram):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+def timed(histogram, **labels):
+    """Context manager observing elapsed time into `histogram`, or a no-op when disabled"""
+    if not ENABLED:
+        return _noop
+    return _timer(histogram.labels(**labels) if labels else histogram)
+
+def observe(histogram, value: float, **labels):
+    if ENABLED:
+        (histogram.labels(**labels) if labels else histogram).observe(value)
+
+def track_query(name: str):
+    """Decorate a query function (sync or async) to record its duration under `name`"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        child = DB_QUERY_DURATION.labels(query=name)
+
+        if not asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return sync_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """Record request latency labelled by route template rather than raw path"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            ).observe(time.perf_counter() - start)
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Sample event-loop lag until cancelled"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+def render_metrics():
+    """Return (payload, content type) for the /metrics endpoint"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
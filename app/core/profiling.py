@@ -0,0 +1,213 @@
+"""
+Opt-in sampling profiler.
+
+A single daemon thread snapshots every thread's Python stack with
+sys._current_frames() while at least one request (or manual capture) is being
+profiled, and sleeps otherwise. Requests slower than PROFILING_SLOW_REQUEST_SECONDS
+get the samples taken during their lifetime folded into a profile; manual
+captures do the same for a fixed window. Profiles are kept in a bounded ring
+buffer and served in folded-stack format, which flamegraph.pl, speedscope and
+inferno read directly.
+
+Because the handlers are async and the DB and encoder calls are synchronous,
+a slow request's samples show what was holding the event loop, not only the
+request's own frames.
+
+Samples are not kept individually: each folded stack is interned once (at most
+PROFILING_MAX_STACKS distinct stacks) and counted per BUCKET_SECONDS time
+bucket, over the last PROFILING_MAX_CAPTURE_SECONDS. Memory is bounded no
+matter how busy the worker is, and a profile only merges the buckets it
+overlaps, so it may include up to one bucket of samples either side.
+"""
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from app.core.config import settings
+
+# Leaf frames of threads that are parked, not working
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("profiling.py", "capture_profile"),
+}
+MAX_STACK_DEPTH = 128
+BUCKET_SECONDS = 0.1
+OVERFLOW_STACK = "[stack table full]"
+
+def fold_stack(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+def is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+class StackSampler:
+    def __init__(self, interval: float, history_seconds: float, max_stacks: int):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        # (bucket index, Counter of stack id -> samples), oldest first
+        self.buckets = deque(maxlen=max(1, math.ceil(history_seconds / BUCKET_SECONDS)) + 1)
+        self.stacks = []  # stack id -> folded stack
+        self.stack_ids = {}  # folded stack -> stack id
+        self.compacted_at = -1  # newest bucket at the last compaction; compacting again before it expires frees little
+        self.active = 0
+        self.lock = threading.Lock()
+        self.data_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def begin(self):
+        with self.lock:
+            self.active += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+                self.thread.start()
+            self.wake.set()
+
+    def end(self):
+        with self.lock:
+            self.active -= 1
+            if self.active == 0:
+                self.wake.clear()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while True:
+            self.wake.wait()
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or is_idle(frame):
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stacks.append(f"{names.get(thread_id, str(thread_id))};{fold_stack(frame)}")
+            self.record(time.monotonic(), stacks)
+            time.sleep(self.interval)
+
+    def record(self, now: float, stacks: list):
+        index = int(now / BUCKET_SECONDS)
+        with self.data_lock:
+            if not self.buckets or self.buckets[-1][0] != index:
+                self.buckets.append((index, Counter()))
+            counts = self.buckets[-1][1]
+            for stack in stacks:
+                counts[self._intern(stack)] += 1
+
+    def _intern(self, stack: str) -> int:
+        stack_id = self.stack_ids.get(stack)
+        if stack_id is None:
+            if len(self.stacks) >= self.max_stacks:
+                if self.buckets[0][0] > self.compacted_at:
+                    self.compacted_at = self.buckets[-1][0]
+                    self._compact()
+                if len(self.stacks) >= self.max_stacks:
+                    return -1
+            stack_id = len(self.stacks)
+            self.stacks.append(stack)
+            self.stack_ids[stack] = stack_id
+        return stack_id
+
+    def _compact(self):
+        """Drop interned stacks that no live bucket refers to any more"""
+        live = sorted({stack_id for _, counts in self.buckets for stack_id in counts if stack_id >= 0})
+        remap = {old: new for new, old in enumerate(live)}
+        self.stacks = [self.stacks[old] for old in live]
+        self.stack_ids = {stack: stack_id for stack_id, stack in enumerate(self.stacks)}
+        for i, (index, counts) in enumerate(self.buckets):
+            self.buckets[i] = (index, Counter({remap.get(stack_id, -1): n for stack_id, n in counts.items()}))
+
+    def collect(self, start: float, end: float) -> Counter:
+        first, last = int(start / BUCKET_SECONDS), int(end / BUCKET_SECONDS)
+        merged = Counter()
+        with self.data_lock:
+            for index, counts in reversed(self.buckets):
+                if index < first:
+                    break
+                if index <= last:
+                    merged.update(counts)
+            return Counter({
+                self.stacks[stack_id] if stack_id >= 0 else OVERFLOW_STACK: n
+                for stack_id, n in merged.items()
+            })
+
+sampler = StackSampler(
+    interval=settings.PROFILING_SAMPLE_INTERVAL_MS / 1000,
+    history_seconds=settings.PROFILING_MAX_CAPTURE_SECONDS,
+    max_stacks=settings.PROFILING_MAX_STACKS
+)
+profiles = deque(maxlen=settings.PROFILING_MAX_PROFILES)
+_profile_ids = itertools.count(1)
+
+def store_profile(kind: str, label: str, duration: float, stacks: Counter) -> dict:
+    profile = {
+        "id": next(_profile_ids),
+        "kind": kind,
+        "label": label,
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": round(duration, 4),
+        "samples": sum(stacks.values()),
+        "stacks": stacks,
+    }
+    profiles.append(profile)
+    return profile
+
+def list_profiles() -> list:
+    return [{k: v for k, v in p.items() if k != "stacks"} for p in reversed(profiles)]
+
+def get_profile(profile_id: int):
+    return next((p for p in profiles if p["id"] == profile_id), None)
+
+def render_folded(profile: dict) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in profile["stacks"].most_common()) + "\n"
+
+def capture_profile(seconds: float) -> dict:
+    """Sample the whole process for `seconds`; blocking, so call it off the event loop"""
+    sampler.begin()
+    start = time.monotonic()
+    try:
+        time.sleep(seconds)
+    finally:
+        end = time.monotonic()
+        sampler.end()
+    return store_profile("capture", f"{seconds:g}s capture", end - start, sampler.collect(start, end))
+
+class SlowRequestProfiler:
+    """Keep a profile of every request that takes longer than the configured threshold"""
+
+    def __init__(self, app):
+        self.app = app
+        self.threshold = settings.PROFILING_SLOW_REQUEST_SECONDS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/api/admin/"):
+            await self.app(scope, receive, send)
+            return
+
+        sampler.begin()
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end = time.monotonic()
+            sampler.end()
+            if end - start >= self.threshold:
+                store_profile(
+                    "slow_request",
+                    f"{scope['method']} {scope['path']}",
+                    end - start,
+                    sampler.collect(start, end)
+                )
@@ -0,0 +1,227 @@
+"""
+Rate limiting and admission control middleware.
+
+Every request draws from a token bucket keyed by route and client: the user
+of a valid bearer token, else the client address. Only tokens whose signature
+checks out are used as the key; an unverified credential would let a client
+mint a fresh bucket per request. Routes without their own limit share one
+"default" bucket per client, so varying a path parameter does not escape it.
+Buckets live in Redis so all workers share them; if Redis is unreachable the
+middleware falls back to per-process buckets and retries Redis after
+RATE_LIMIT_REDIS_RETRY_SECONDS. Routes with an admission gate additionally cap
+how many requests may be executing or waiting, shedding the rest with a 503
+instead of letting the encoder queue grow without bound. The gate only works
+because the encode handlers run the model off the event loop, holding their
+slot until it finishes; it stays on when RATE_LIMIT_ENABLED is false.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.db.redis_client import get_async_redis_client
+
+# KEYS: bucket | ARGV: rate, burst, now, cost -> {allowed, retry_after}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+EXEMPT_PATHS = {"/", "/docs", "/redoc", "/openapi.json"}
+
+class TokenBucket:
+    """In-process token bucket used when Redis is unavailable"""
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def take(self, rate: float, burst: int, cost: float = 1.0):
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / rate
+
+class AdmissionGate:
+    """
+    Bounded concurrency with a bounded wait queue.
+    Requests beyond max_in_flight wait up to `timeout` seconds for a slot;
+    once max_queue requests are already waiting, new ones are rejected at once.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, timeout: float):
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            return True
+        if self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self.semaphore.release()
+
+def route_limits() -> dict:
+    """Per-route (requests per second, burst) overrides"""
+    return {
+        "/api/encode/text": (settings.RATE_LIMIT_ENCODE_PER_SECOND, settings.RATE_LIMIT_ENCODE_BURST),
+        "/api/encode/texts": (settings.RATE_LIMIT_ENCODE_PER_SECOND, settings.RATE_LIMIT_ENCODE_BURST),
+        "/api/task/create": (settings.RATE_LIMIT_TASK_PER_SECOND, settings.RATE_LIMIT_TASK_BURST),
+    }
+
+def trusted_proxies() -> set:
+    return set(filter(None, (ip.strip() for ip in settings.RATE_LIMIT_TRUSTED_PROXIES.split(","))))
+
+def token_subject(authorization: bytes):
+    """The `sub` of a bearer token with a valid signature and expiry, else None"""
+    if not settings.SECRET_KEY or not authorization.lower().startswith(b"bearer "):
+        return None
+    try:
+        payload = jwt.decode(
+            authorization[7:].decode("latin-1").strip(),
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    return str(subject) if subject else None
+
+def client_identity(scope, proxies: set = frozenset()) -> str:
+    """
+    Bucket by the user of a verified bearer token, so users behind one NAT get
+    their own buckets, else by client address. X-Forwarded-For is only
+    honoured when the peer is one of our own proxies, and then the right-most
+    entry not added by a trusted proxy is used, since everything left of it is
+    client-controlled.
+    """
+    headers = dict(scope.get("headers") or [])
+    subject = token_subject(headers.get(b"authorization", b""))
+    if subject:
+        return "user:" + subject
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if address in proxies:
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            for hop in reversed(forwarded.decode("latin-1").split(",")):
+                hop = hop.strip()
+                if hop and hop not in proxies:
+                    return "ip:" + hop
+    return "ip:" + address
+
+class RateLimitMiddleware:
+    def __init__(self, app, max_local_buckets: int = 10000):
+        self.app = app
+        self.limits = route_limits()
+        self.default_limit = (settings.RATE_LIMIT_DEFAULT_PER_SECOND, settings.RATE_LIMIT_DEFAULT_BURST)
+        self.proxies = trusted_proxies()
+        encoder_gate = AdmissionGate(
+            settings.ENCODE_MAX_IN_FLIGHT,
+            settings.ENCODE_MAX_QUEUE,
+            settings.ENCODE_QUEUE_TIMEOUT_SECONDS
+        )
+        self.gates = {
+            "/api/encode/text": encoder_gate,
+            "/api/encode/texts": encoder_gate,
+        }
+        self.local_buckets = OrderedDict()
+        self.max_local_buckets = max_local_buckets
+        self.redis_disabled_until = 0.0
+        self.script = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if settings.RATE_LIMIT_ENABLED:
+            route = path if path in self.limits else "default"
+            rate, burst = self.limits.get(route, self.default_limit)
+            allowed, retry_after = await self.take(f"{route}:{client_identity(scope, self.proxies)}", rate, burst)
+            if not allowed:
+                await self.reject(429, "Rate limit exceeded", retry_after)(scope, receive, send)
+                return
+
+        gate = self.gates.get(path)
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        if not await gate.acquire():
+            await self.reject(503, "Server is busy, please retry", 1)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    async def take(self, key: str, rate: float, burst: int):
+        if time.monotonic() >= self.redis_disabled_until:
+            try:
+                if self.script is None:
+                    self.script = get_async_redis_client().register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, retry_after = await self.script(
+                    keys=[f"ratelimit:{key}"],
+                    args=[rate, burst, time.time(), 1]
+                )
+                return bool(int(allowed)), float(retry_after)
+            except (RedisError, OSError) as e:
+                print(f"Rate limiter falling back to local buckets: {e}")
+                self.redis_disabled_until = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+        return self.take_local(key, rate, burst)
+
+    def take_local(self, key: str, rate: float, burst: int):
+        bucket = self.local_buckets.get(key)
+        if bucket is None:
+            bucket = self.local_buckets[key] = TokenBucket(burst)
+            if len(self.local_buckets) > self.max_local_buckets:
+                self.local_buckets.popitem(last=False)
+        else:
+            self.local_buckets.move_to_end(key)
+        return bucket.take(rate, burst)
+
+    @staticmethod
+    def reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+        return JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
@@ -1,29 +1,156 @@
 import os
+import itertools
+import threading
+import time
+from contextvars import ContextVar
 from psycopg2 import pool
+import psycopg2
 from app.core.config import settings
+from app.core.metrics import DB_POOL_WAIT, timed
 import contextlib
 from dotenv import load_dotenv
 
 connection_pool = None
+replicas = []  # one Replica per DATABASE_REPLICA_URLS entry
+_next_replica = itertools.count()
+_init_lock = threading.Lock()
+
+# Read-your-writes scope for the current request or unit of work: a one-item
+# list set to True once it has used the primary, so its later readonly reads
+# stay there and see its writes. A list rather than a bool so the flag also
+# propagates out of threadpool calls, which run in a copy of the context.
+# Outside any scope (threads, scripts) readonly reads always try a replica.
+_used_primary = ContextVar("used_primary", default=None)
+
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class LazyConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Opens no connections up front, so a replica that is down at startup does not
+    fail init and can be retried later, but still keeps up to `minconn` returned
+    connections idle for reuse.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(0, maxconn, *args, **kwargs)
+        self.minconn = minconn
+
+class Replica:
+    def __init__(self, config: dict):
+        self.pool = LazyConnectionPool(**config)
+        self.lag = None
+        self.checked_at = 0.0
+
+    def usable(self, conn) -> bool:
+        """Whether the replica is within DATABASE_REPLICA_MAX_LAG_SECONDS, re-measured at most every LAG_CHECK seconds"""
+        now = time.monotonic()
+        if self.lag is None or now - self.checked_at > settings.DATABASE_REPLICA_LAG_CHECK_SECONDS:
+            with conn.cursor() as cur:
+                cur.execute(REPLICA_LAG_QUERY)
+                self.lag = float(cur.fetchone()[0])
+            conn.rollback()
+            self.checked_at = now
+        return self.lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+
+    def mark_down(self):
+        self.lag = float("inf")
+        self.checked_at = time.monotonic()
 
 def init_connection_pool():
     global connection_pool
-    if connection_pool is None:
+    with _init_lock:
+        if connection_pool is not None:
+            return
         try:
-            connection_pool = pool.SimpleConnectionPool(
+            # Threaded: the task write-behind flusher and threadpool handlers
+            # check connections out concurrently with the event loop thread
+            connection_pool = pool.ThreadedConnectionPool(
                 **settings.database_config
             )
             print("✅Database pool initialized successfully✅")
         except Exception as e:
             print(f"Error creating connection pool: {e}")
             raise
+        for config in settings.replica_database_configs:
+            replicas.append(Replica(config))
+        if replicas:
+            print(f"✅{len(replicas)} read replica pool(s) initialized✅")
+
+def _replica_connection():
+    """A connection to a healthy, caught-up replica, or None"""
+    start = next(_next_replica)
+    for i in range(len(replicas)):
+        replica = replicas[(start + i) % len(replicas)]
+        if replica.lag is not None and replica.lag > settings.DATABASE_REPLICA_MAX_LAG_SECONDS \
+                and time.monotonic() - replica.checked_at <= settings.DATABASE_REPLICA_LAG_CHECK_SECONDS:
+            continue
+        try:
+            with timed(DB_POOL_WAIT):
+                conn = replica.pool.getconn()
+        except (pool.PoolError, psycopg2.OperationalError):
+            replica.mark_down()
+            continue
+        try:
+            if replica.usable(conn):
+                return replica, conn
+            replica.pool.putconn(conn)
+        except psycopg2.Error:
+            replica.mark_down()
+            replica.pool.putconn(conn, close=True)
+    return None
+
+@contextlib.contextmanager
+def primary_scope():
+    """Start a fresh read-your-writes scope; see _used_primary"""
+    token = _used_primary.set([False])
+    try:
+        yield
+    finally:
+        _used_primary.reset(token)
+
+class ReadYourWritesMiddleware:
+    """Give every HTTP request its own read-your-writes scope"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with primary_scope():
+            await self.app(scope, receive, send)
 
 @contextlib.contextmanager
-def get_db_connection():
-    """Get a database connection from the pool"""
+def get_db_connection(readonly: bool = False):
+    """
+    Get a database connection from the pool.
+    readonly=True routes to a read replica when one is configured, within the
+    lag limit, and the current primary_scope() has not used the primary yet;
+    otherwise it falls back to the primary.
+    """
     if connection_pool is None:
         init_connection_pool()
-    conn = connection_pool.getconn()
+    used_primary = _used_primary.get()
+    if readonly and replicas and not (used_primary and used_primary[0]):
+        routed = _replica_connection()
+        if routed:
+            replica, conn = routed
+            try:
+                yield conn
+            finally:
+                replica.pool.putconn(conn)
+            return
+    if not readonly and used_primary is not None:
+        used_primary[0] = True
+    with timed(DB_POOL_WAIT):
+        conn = connection_pool.getconn()
     try:
         yield conn
     finally:
@@ -34,6 +161,9 @@ def close_all_db_connections():
     if connection_pool:
         print("🚫Closing all database connections in the pool🚫")
         connection_pool.closeall()
+    for replica in replicas:
+        replica.pool.closeall()
+    replicas.clear()
 
 import atexit
 atexit.register(close_all_db_connections)
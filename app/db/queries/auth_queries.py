@@ -1,25 +1,39 @@
 from app.db.connection import get_db_connection
 from psycopg2.extras import DictCursor
 from app.schemas.auth import PasswordReset
+from app.core.metrics import track_query
+from app.services.user_cache import invalidate_user
 
+@track_query("get_user")
 async def get_user(username: str):
     query = """
         SELECT id, username, password, email, name 
         FROM users 
         WHERE username = %s
     """
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
+        with conn.cursor(cursor_factory=DictCursor) as cur:
+            cur.execute(query, (username,))
+            return cur.fetchone()
+
+@track_query("get_user_profile")
+async def get_user_profile(username: str):
+    """Public profile fields only; use get_user when the password hash is needed"""
+    query = "SELECT id, username, email, name FROM users WHERE username = %s"
+    with get_db_connection(readonly=True) as conn:
         with conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute(query, (username,))
             return cur.fetchone()
 
+@track_query("get_user_by_email")
 async def get_user_by_email(email: str):
-    query = "SELECT * FROM users WHERE email = %s"
-    with get_db_connection() as conn:
+    query = "SELECT id, username, email, name FROM users WHERE email = %s"
+    with get_db_connection(readonly=True) as conn:
         with conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute(query, (email,))
             return cur.fetchone()
 
+@track_query("create_new_user")
 async def create_new_user(user_data: dict):
     query = """
         INSERT INTO users (username, password, email, name)
@@ -35,8 +49,12 @@ async def create_new_user(user_data: dict):
                 user_data["name"]
             ))
             conn.commit()
-            return cur.fetchone()[0]
+            user_id = cur.fetchone()[0]
+    # Clears cached "no such user" entries for the new username and email
+    await invalidate_user(user_data["username"], user_data["email"])
+    return user_id
 
+@track_query("blacklist_token")
 async def blacklist_token(token: str):
     query = """
         INSERT INTO token_blacklist (token, blacklisted_on)
@@ -47,15 +65,17 @@ async def blacklist_token(token: str):
             cur.execute(query, (token,))
             conn.commit()
 
+@track_query("is_token_blacklisted")
 async def is_token_blacklisted(token: str) -> bool:
     query = "SELECT EXISTS(SELECT 1 FROM token_blacklist WHERE token = %s)"
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         with conn.cursor() as cur:
             cur.execute(query, (token,))
             return cur.fetchone()[0]
 
+@track_query("reset_user_password")
 async def reset_user_password(email: str, new_password: str):
-    query = "UPDATE users SET password = %s WHERE email = %s RETURNING id"
+    query = "UPDATE users SET password = %s WHERE email = %s RETURNING id, username"
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (new_password, email))
@@ -63,4 +83,5 @@ async def reset_user_password(email: str, new_password: str):
             if not result:
                 raise ValueError("Email not found")
             conn.commit()
-            return result[0]
+    await invalidate_user(result[1], email)
+    return result[0]
@@ -0,0 +1,105 @@
+from app.db.connection import get_db_connection
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2 import errors
+from typing import Optional, Tuple
+from datetime import datetime
+from app.core.metrics import track_query
+
+MESSAGE_COLUMNS = "id, chat_id, role, content, created_at"
+
+@track_query("create_chat")
+async def create_chat(chat_id: str, user_id: str, title: str):
+    query = """
+        INSERT INTO chats (id, user_id, title, created_at, updated_at)
+        VALUES (%s, %s, %s, LOCALTIMESTAMP, LOCALTIMESTAMP)
+        RETURNING id, user_id, title, created_at, updated_at
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (chat_id, user_id, title))
+            conn.commit()
+            return cur.fetchone()
+
+@track_query("get_chat")
+async def get_chat(chat_id: str):
+    query = "SELECT id, user_id, title, created_at, updated_at FROM chats WHERE id = %s"
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (chat_id,))
+            return cur.fetchone()
+
+@track_query("append_chat_messages")
+async def append_chat_messages(chat_id: str, messages: list):
+    """
+    Insert a batch of messages in one round-trip.
+    Each message gets LOCALTIMESTAMP plus its batch offset in microseconds so the
+    batch keeps its order under the (chat_id, created_at, id) index. Messages whose
+    id already exists are skipped, which makes client retries idempotent.
+    Returns only the rows that were actually inserted, oldest first.
+    """
+    rows = [
+        (message["id"], chat_id, message["role"], message["content"], offset)
+        for offset, message in enumerate(messages)
+    ]
+    insert_query = f"""
+        INSERT INTO chat_messages (id, chat_id, role, content, created_at)
+        VALUES %s
+        ON CONFLICT (id) DO NOTHING
+        RETURNING {MESSAGE_COLUMNS}
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            try:
+                inserted = execute_values(
+                    cur,
+                    insert_query,
+                    rows,
+                    template="(%s, %s, %s, %s, LOCALTIMESTAMP + %s * INTERVAL '1 microsecond')",
+                    page_size=len(rows),
+                    fetch=True
+                )
+                if inserted:
+                    cur.execute(
+                        "UPDATE chats SET updated_at = %s WHERE id = %s",
+                        (max(row["created_at"] for row in inserted), chat_id)
+                    )
+                conn.commit()
+            except errors.ForeignKeyViolation:
+                conn.rollback()
+                raise ValueError("Chat not found")
+            except Exception:
+                conn.rollback()
+                raise
+    return sorted(inserted, key=lambda row: (row["created_at"], row["id"]))
+
+@track_query("get_chat_messages")
+async def get_chat_messages(chat_id: str, limit: int, before: Optional[Tuple[datetime, str]] = None):
+    """
+    Return up to `limit` messages older than the `before` keyset, oldest first.
+    Walks idx_chat_messages_chat_created backwards, so the cost is O(limit)
+    regardless of how long the chat history is.
+    """
+    if before is None:
+        query = f"""
+            SELECT {MESSAGE_COLUMNS}
+            FROM chat_messages
+            WHERE chat_id = %s
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+        params = (chat_id, limit)
+    else:
+        query = f"""
+            SELECT {MESSAGE_COLUMNS}
+            FROM chat_messages
+            WHERE chat_id = %s AND (created_at, id) < (%s, %s)
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+        params = (chat_id, before[0], before[1], limit)
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+    rows.reverse()
+    return rows
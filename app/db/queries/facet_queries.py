@@ -0,0 +1,77 @@
+from app.db.connection import get_db_connection
+from psycopg2.extras import RealDictCursor
+from app.core.metrics import track_query
+
+FACET_VIEWS = ("job_facet_locations", "job_facet_job_types", "job_facet_salaries", "job_task_summaries")
+
+@track_query("get_job_facets")
+async def get_job_facets(limit: int) -> dict:
+    """Top `limit` locations and job types plus the salary histogram, in one round-trip"""
+    query = """
+        SELECT 'location' AS facet, location AS value, NULL::INTEGER AS bucket_min, job_count
+        FROM (SELECT * FROM job_facet_locations ORDER BY job_count DESC, location LIMIT %s) l
+        UNION ALL
+        SELECT 'job_type', job_type, NULL, job_count
+        FROM (SELECT * FROM job_facet_job_types ORDER BY job_count DESC, job_type LIMIT %s) t
+        UNION ALL
+        SELECT 'salary', salary_currency, bucket_min, job_count
+        FROM job_facet_salaries
+    """
+    with get_db_connection(readonly=True) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (limit, limit))
+            rows = cur.fetchall()
+
+    facets = {"locations": [], "job_types": [], "salaries": {}}
+    for row in rows:
+        if row["facet"] == "location":
+            facets["locations"].append({"value": row["value"], "count": row["job_count"]})
+        elif row["facet"] == "job_type":
+            facets["job_types"].append({"value": row["value"], "count": row["job_count"]})
+        else:
+            facets["salaries"].setdefault(row["value"], []).append({"min": row["bucket_min"], "count": row["job_count"]})
+    for buckets in facets["salaries"].values():
+        buckets.sort(key=lambda bucket: bucket["min"])
+    return facets
+
+@track_query("get_task_summary")
+async def get_task_summary(task_id: str):
+    query = """
+        SELECT task_id, total_jobs, duplicate_jobs, embedded_jobs, failed_jobs, distinct_locations,
+               distinct_companies, salary_min, salary_max, last_processed_at
+        FROM job_task_summaries
+        WHERE task_id = %s
+    """
+    with get_db_connection(readonly=True) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (task_id,))
+            return cur.fetchone()
+
+@track_query("refresh_job_facets")
+def refresh_job_facets() -> bool:
+    """
+    Refresh every facet view concurrently, so readers keep seeing the previous
+    contents until each refresh commits. Returns False without doing anything
+    if another refresh is already running.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(hashtext('job_facets_refresh'))")
+                if not cur.fetchone()[0]:
+                    conn.rollback()
+                    return False
+                try:
+                    for view in FACET_VIEWS:
+                        cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                        conn.commit()
+                finally:
+                    # The lock is session-level, so it survives the rollback; release it
+                    # either way, or it stays held on this pooled connection
+                    conn.rollback()
+                    cur.execute("SELECT pg_advisory_unlock(hashtext('job_facets_refresh'))")
+                    conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return True
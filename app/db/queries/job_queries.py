@@ -0,0 +1,267 @@
+from collections import defaultdict
+import numpy as np
+import psycopg2
+from app.db.connection import get_db_connection
+from psycopg2.extras import RealDictCursor, execute_values
+from app.core.config import settings
+from app.core.metrics import track_query
+from app.services import dedup
+
+PROCESSED_JOB_COLUMNS = (
+    "raw_job_id", "task_id", "title", "company", "location", "description", "url",
+    "job_type", "salary_min", "salary_max", "salary_currency",
+)
+
+def find_canonical_jobs(cur, signatures: list, bands: list) -> list:
+    """
+    Resolve each signature to a canonical job id, or None if it is new.
+    In-batch matches are returned as ("batch", index) so the caller can
+    link them once the earlier row has an id.
+    """
+    cur.execute(
+        """
+        SELECT b.band, b.bucket_hash, m.processed_job_id, m.signature
+        FROM job_lsh_buckets b
+        JOIN job_minhash m USING (processed_job_id)
+        WHERE (b.band, b.bucket_hash) IN (
+            SELECT * FROM unnest(%s::smallint[], %s::bigint[])
+        )
+        """,
+        (
+            [band for hashes in bands for band in range(len(hashes))],
+            [bucket for hashes in bands for bucket in hashes],
+        )
+    )
+    buckets = defaultdict(set)
+    known = {}
+    for band, bucket_hash, job_id, signature in cur.fetchall():
+        buckets[(band, bucket_hash)].add(job_id)
+        known[job_id] = dedup.from_bytes(signature)
+
+    canonical = []
+    for index, (signature, hashes) in enumerate(zip(signatures, bands)):
+        candidates = set().union(*(buckets.get((band, h), ()) for band, h in enumerate(hashes)))
+        best, best_score = None, settings.DEDUP_THRESHOLD
+        for candidate in candidates:
+            score = dedup.similarity(signature, known[candidate][None, :])[0]
+            if score >= best_score:
+                best, best_score = candidate, score
+        canonical.append(best)
+        if best is None:
+            # Later rows in the same batch may duplicate this one
+            key = ("batch", index)
+            known[key] = signature
+            for band, h in enumerate(hashes):
+                buckets[(band, h)].add(key)
+    return canonical
+
+@track_query("insert_processed_jobs")
+def insert_processed_jobs(jobs: list) -> list:
+    """
+    Insert a batch of processed jobs, linking near-duplicates to a canonical row.
+    Duplicates get canonical_job_id and embedding_status 'DUPLICATE' so they are
+    never embedded or pushed to the vector store; only canonical rows enter the
+    LSH index. Returns [{"id", "canonical_job_id"}] in input order.
+    """
+    if not jobs:
+        return []
+    signatures = [dedup.minhash(job) for job in jobs] if settings.DEDUP_ENABLED else None
+    bands = [dedup.band_hashes(signature) for signature in signatures] if signatures else None
+
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                canonical = [None] * len(jobs)
+                if signatures:
+                    # Serialise dedup across workers so two copies scraped at once cannot both become canonical
+                    cur.execute("SELECT pg_advisory_xact_lock(hashtext('processed_jobs_dedup'))")
+                    canonical = find_canonical_jobs(cur, signatures, bands)
+
+                rows = [
+                    tuple(job.get(column) for column in PROCESSED_JOB_COLUMNS) + (
+                        canonical[i] if isinstance(canonical[i], int) else None,
+                        "PENDING" if canonical[i] is None else "DUPLICATE",
+                    )
+                    for i, job in enumerate(jobs)
+                ]
+                ids = [row[0] for row in execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO processed_jobs ({", ".join(PROCESSED_JOB_COLUMNS)}, canonical_job_id, embedding_status)
+                    VALUES %s
+                    RETURNING id
+                    """,
+                    rows,
+                    page_size=len(rows),
+                    fetch=True
+                )]
+                canonical = [ids[c[1]] if isinstance(c, tuple) else c for c in canonical]
+
+                in_batch = [(canonical[i], ids[i]) for i, row in enumerate(rows) if row[-2] is None and canonical[i]]
+                if in_batch:
+                    execute_values(
+                        cur,
+                        """
+                        UPDATE processed_jobs p SET canonical_job_id = v.canonical
+                        FROM (VALUES %s) AS v(canonical, id)
+                        WHERE p.id = v.id
+                        """,
+                        in_batch
+                    )
+
+                if signatures:
+                    new_rows = [i for i in range(len(jobs)) if canonical[i] is None]
+                    execute_values(
+                        cur,
+                        "INSERT INTO job_minhash (processed_job_id, signature) VALUES %s",
+                        [(ids[i], dedup.to_bytes(signatures[i])) for i in new_rows]
+                    )
+                    execute_values(
+                        cur,
+                        "INSERT INTO job_lsh_buckets (band, bucket_hash, processed_job_id) VALUES %s",
+                        [(band, h, ids[i]) for i in new_rows for band, h in enumerate(bands[i])],
+                        page_size=1000
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return [{"id": ids[i], "canonical_job_id": canonical[i]} for i in range(len(jobs))]
+
+@track_query("process_raw_jobs")
+def process_raw_jobs(task_id: str, batch_size: int = 500) -> dict:
+    """
+    Move a task's scraped raw_jobs into processed_jobs through
+    insert_processed_jobs, so every row passes the near-duplicate check.
+    The scrape worker (tasks.process_job_task, outside this repo) must call
+    this once a task's raw_jobs are written; until it does, dedup is not on the
+    ingest path. Raw rows that already have a processed row are skipped, so a
+    retried task only processes what is left; run one call per task at a time.
+    Returns counts of inserted and duplicate rows.
+    """
+    query = """
+        SELECT r.id AS raw_job_id, r.task_id, r.title, r.company, r.location, r.description,
+               r.job_url AS url, r.job_type, r.salary_min, r.salary_max, r.salary_currency
+        FROM raw_jobs r
+        WHERE r.task_id = %s AND r.id > %s
+          AND NOT EXISTS (SELECT 1 FROM processed_jobs p WHERE p.raw_job_id = r.id)
+        ORDER BY r.id
+        LIMIT %s
+    """
+    counts = {"inserted": 0, "duplicates": 0}
+    after_id = 0
+    while True:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, (task_id, after_id, batch_size))
+                jobs = cur.fetchall()
+            conn.rollback()
+        if not jobs:
+            return counts
+        results = insert_processed_jobs(jobs)
+        counts["inserted"] += len(results)
+        counts["duplicates"] += sum(1 for result in results if result["canonical_job_id"] is not None)
+        after_id = jobs[-1]["raw_job_id"]
+
+@track_query("fetch_jobs_for_embedding")
+def fetch_jobs_for_embedding(after_id: int, limit: int, model: str, statuses: list = None) -> list:
+    """
+    Next keyset chunk of canonical jobs to (re-)embed, ordered by id.
+    With `statuses`, selects jobs in those embedding states; without, selects
+    jobs that have no vector for `model` yet.
+    """
+    if statuses:
+        condition, params = "embedding_status = ANY(%s)", [statuses]
+    else:
+        condition = """
+            embedding_status <> 'DUPLICATE'
+            AND NOT EXISTS (
+                SELECT 1 FROM job_embeddings e WHERE e.processed_job_id = p.id AND e.model = %s
+            )
+        """
+        params = [model]
+    query = f"""
+        SELECT id, title, company, location, description
+        FROM processed_jobs p
+        WHERE id > %s AND canonical_job_id IS NULL AND {condition}
+        ORDER BY id
+        LIMIT %s
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, [after_id] + params + [limit])
+            return cur.fetchall()
+
+@track_query("store_job_embeddings")
+def store_job_embeddings(model: str, embeddings: list, failed_ids: list = ()):
+    """
+    Upsert (job id, float32 vector) pairs for `model` and mark those jobs SUCCESS,
+    and mark `failed_ids` FAILED, all in one transaction. The same transaction
+    queues each vector in vector_outbox, so the vector store is synced if and
+    only if the vector was committed here.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                if embeddings:
+                    execute_values(
+                        cur,
+                        """
+                        INSERT INTO job_embeddings (processed_job_id, model, dimension, embedding, updated_at)
+                        VALUES %s
+                        ON CONFLICT (processed_job_id, model) DO UPDATE SET
+                            dimension = EXCLUDED.dimension,
+                            embedding = EXCLUDED.embedding,
+                            updated_at = EXCLUDED.updated_at
+                        """,
+                        [
+                            (job_id, model, len(vector), psycopg2.Binary(np.asarray(vector, dtype="<f4").tobytes()))
+                            for job_id, vector in embeddings
+                        ],
+                        template="(%s, %s, %s, %s, LOCALTIMESTAMP)",
+                        page_size=500
+                    )
+                    cur.execute(
+                        "UPDATE processed_jobs SET embedding_status = 'SUCCESS' WHERE id = ANY(%s)",
+                        ([job_id for job_id, _ in embeddings],)
+                    )
+                    execute_values(
+                        cur,
+                        "INSERT INTO vector_outbox (processed_job_id, model) VALUES %s",
+                        [(job_id, model) for job_id, _ in embeddings],
+                        page_size=1000
+                    )
+                if failed_ids:
+                    cur.execute(
+                        "UPDATE processed_jobs SET embedding_status = 'FAILED' WHERE id = ANY(%s)",
+                        (list(failed_ids),)
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+@track_query("load_job_embeddings")
+def load_job_embeddings(model: str, batch_size: int = 10000):
+    """
+    All stored vectors for `model` as (ids int64 array, float32 matrix), read
+    through a server-side cursor so the result set is never held twice.
+    """
+    ids, chunks = [], []
+    with get_db_connection(readonly=True) as conn:
+        with conn.cursor(name="load_job_embeddings") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                "SELECT processed_job_id, embedding FROM job_embeddings WHERE model = %s ORDER BY processed_job_id",
+                (model,)
+            )
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                ids.extend(row[0] for row in rows)
+                chunks.append(np.frombuffer(b"".join(bytes(row[1]) for row in rows), dtype="<f4").reshape(len(rows), -1))
+        conn.rollback()
+    if not ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+    return np.asarray(ids, dtype=np.int64), np.concatenate(chunks).astype(np.float32, copy=False)
@@ -0,0 +1,144 @@
+from app.db.connection import get_db_connection
+from psycopg2.extras import Json, RealDictCursor
+from psycopg2 import errors
+from app.core.metrics import track_query
+
+RESUME_COLUMNS = """
+    id, user_id, title, file_path, file_type, status, content_hash, parse_error,
+    personal_info_name, personal_info_phone, personal_info_email, personal_info_linkedin, personal_info_github,
+    education, experience, projects, technical_skills, certifications_achievements, created_at, updated_at
+"""
+PARSED_COLUMNS = (
+    "personal_info_name", "personal_info_phone", "personal_info_email", "personal_info_linkedin",
+    "personal_info_github", "education", "experience", "projects", "technical_skills",
+    "certifications_achievements",
+)
+
+@track_query("create_pending_resume")
+async def create_pending_resume(user_id: str, title: str, file_path: str, file_type: str, content_hash: str):
+    """
+    Insert a pending resume with empty structured fields until it is parsed.
+    If this user already uploaded the same file, returns that resume instead.
+    Returns (resume, created).
+    """
+    insert = f"""
+        INSERT INTO resumes (
+            user_id, title, file_path, file_type, content_hash, status, parse_claimed_at,
+            personal_info_name, personal_info_phone, personal_info_email,
+            education, experience, projects, technical_skills, certifications_achievements,
+            created_at, updated_at
+        )
+        VALUES (%s, %s, %s, %s, %s, 'pending', LOCALTIMESTAMP, '', '', '', '[]', '[]', '[]', '[]', '[]', LOCALTIMESTAMP, LOCALTIMESTAMP)
+        ON CONFLICT (user_id, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+        RETURNING {RESUME_COLUMNS}
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(insert, (user_id, title, file_path, file_type, content_hash))
+                resume = cur.fetchone()
+                if resume is None:
+                    cur.execute(
+                        f"SELECT {RESUME_COLUMNS} FROM resumes WHERE user_id = %s AND content_hash = %s",
+                        (user_id, content_hash)
+                    )
+                    existing = cur.fetchone()
+            conn.commit()
+        except errors.ForeignKeyViolation:
+            conn.rollback()
+            raise ValueError("User not found")
+        except Exception:
+            conn.rollback()
+            raise
+    return (resume, True) if resume is not None else (existing, False)
+
+@track_query("get_resume")
+async def get_resume(resume_id: int):
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"SELECT {RESUME_COLUMNS} FROM resumes WHERE id = %s", (resume_id,))
+            return cur.fetchone()
+
+@track_query("reclaim_resume_parse")
+async def reclaim_resume_parse(resume_id: int, lease_seconds: float) -> bool:
+    """
+    Take a fresh parse lease on a pending resume whose last parse failed or
+    whose lease has expired (e.g. the parse was cancelled by a restart),
+    clearing any recorded failure. Returns False if the resume is not pending
+    or another parse still holds the lease.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE resumes SET parse_error = NULL, parse_claimed_at = LOCALTIMESTAMP, updated_at = LOCALTIMESTAMP
+                WHERE id = %s AND status = 'pending' AND (
+                    parse_error IS NOT NULL
+                    OR parse_claimed_at IS NULL
+                    OR parse_claimed_at < LOCALTIMESTAMP - make_interval(secs => %s)
+                )
+                RETURNING id
+                """,
+                (resume_id, lease_seconds)
+            )
+            claimed = cur.fetchone() is not None
+            conn.commit()
+    return claimed
+
+@track_query("complete_resume_parse")
+async def complete_resume_parse(resume_id: int, parsed: dict):
+    """Store the parsed fields and move the resume from pending to active"""
+    assignments = ", ".join(f"{column} = %s" for column in PARSED_COLUMNS)
+    values = [
+        Json(parsed[column]) if isinstance(parsed[column], (list, dict)) else parsed[column]
+        for column in PARSED_COLUMNS
+    ]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                UPDATE resumes SET {assignments}, status = 'active', parse_error = NULL, updated_at = LOCALTIMESTAMP
+                WHERE id = %s AND status = 'pending'
+                """,
+                values + [resume_id]
+            )
+            conn.commit()
+
+@track_query("fail_resume_parse")
+async def fail_resume_parse(resume_id: int, error: str):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE resumes SET parse_error = %s, updated_at = LOCALTIMESTAMP WHERE id = %s AND status = 'pending'",
+                (error, resume_id)
+            )
+            conn.commit()
+
+@track_query("claim_unparsed_resumes")
+async def claim_unparsed_resumes(lease_seconds: float):
+    """
+    Take the parse lease on every pending resume that has a file, no recorded
+    failure and no live lease. Concurrent callers (one per API worker at
+    startup) skip each other's rows, so each resume is claimed once.
+    """
+    query = """
+        UPDATE resumes SET parse_claimed_at = LOCALTIMESTAMP
+        WHERE id IN (
+            SELECT id FROM resumes
+            WHERE status = 'pending' AND parse_error IS NULL AND file_path IS NOT NULL
+              AND (parse_claimed_at IS NULL OR parse_claimed_at < LOCALTIMESTAMP - make_interval(secs => %s))
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, file_path, file_type
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, (lease_seconds,))
+                resumes = cur.fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return resumes
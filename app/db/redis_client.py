@@ -0,0 +1,28 @@
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+redis_client = None
+async_redis_client = None
+
+def get_redis_client():
+    """Get the shared Redis client, creating it on first use"""
+    global redis_client
+    if redis_client is None:
+        redis_client = redis.Redis(
+            **settings.redis_config,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+    return redis_client
+
+def get_async_redis_client():
+    """Get the shared asyncio Redis client for use on the event loop"""
+    global async_redis_client
+    if async_redis_client is None:
+        async_redis_client = aioredis.Redis(
+            **settings.redis_config,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25
+        )
+    return async_redis_client
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+class ChatCreate(BaseModel):
+    id: Optional[str] = None
+    user_id: str
+    title: str
+
+class ChatMessageIn(BaseModel):
+    id: Optional[str] = None
+    role: Literal["user", "assistant", "system"]
+    content: str
+
+class ChatMessageAppend(BaseModel):
+    messages: List[ChatMessageIn] = Field(min_length=1)
+
+class ChatMessage(BaseModel):
+    id: str
+    chat_id: str
+    role: str
+    content: str
+    created_at: datetime
+
+class ChatMessagePage(BaseModel):
+    messages: List[ChatMessage]
+    next_cursor: Optional[str] = None  # pass as `before` to load older messages
@@ -1,7 +1,28 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class EncodeRequest(BaseModel):
     text: str
+    model: Optional[str] = None  # defaults to EMBEDDING_MODEL
+    long_text: bool = False  # split into overlapping windows instead of truncating
+    pooling: Literal["mean", "weighted"] = "weighted"
 
 class EncodeResponse(BaseModel):
     embedding: list[float]
+    model: str
+    dimension: int
+    token_count: Optional[int] = None
+    chunks: Optional[int] = None
+
+class EncodeBatchRequest(BaseModel):
+    texts: List[str] = Field(min_length=1)
+    model: Optional[str] = None
+    long_text: bool = False
+    pooling: Literal["mean", "weighted"] = "weighted"
+
+class EncodeBatchResponse(BaseModel):
+    embeddings: List[list[float]]
+    model: str
+    dimension: int
+    token_counts: Optional[List[int]] = None
+    chunks: Optional[List[int]] = None
@@ -49,6 +49,7 @@ class ProcessedJob(BaseModel):
     salary_currency: Optional[str] = None
     pinecone_id: Optional[str] = None
     embedding_status: str = "PENDING"
+    canonical_job_id: Optional[int] = None  # set when this job is a near-duplicate
     processed_at: Optional[datetime] = None
 
 class TaskLog(BaseModel):
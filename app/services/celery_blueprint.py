@@ -3,7 +3,16 @@ import ssl
 import certifi
 from app.core.config import settings
 from app.db.connection import init_connection_pool
-from celery.signals import worker_ready
+from celery.signals import (
+    worker_ready,
+    worker_shutdown,
+    task_prerun,
+    task_postrun,
+    task_retry,
+    task_failure,
+    after_setup_task_logger,
+)
+from app.services.task_writer import task_writer, TaskLogHandler
 
 
 # Configure Celery client
@@ -38,6 +47,34 @@ def on_worker_ready(sender, **kwargs):
     except Exception as e:
         print(f"❌ Failed to initialize database connection pool: {e}")
         raise
+
+@worker_shutdown.connect
+def on_worker_shutdown(sender, **kwargs):
+    task_writer.close()
+
+# Task lifecycle is buffered and written in batches by the write-behind writer
+@task_prerun.connect
+def on_task_prerun(task_id=None, task=None, args=None, kwargs=None, **extra):
+    task_writer.task_status(task_id, "PROCESSING", task_name=task.name if task else None)
+
+@task_postrun.connect
+def on_task_postrun(task_id=None, task=None, state=None, **extra):
+    if state and state != "RETRY":
+        task_writer.task_status(task_id, state, task_name=task.name if task else None)
+
+@task_retry.connect
+def on_task_retry(sender=None, request=None, reason=None, **extra):
+    task_writer.task_status(request.id, "RETRY", task_name=sender.name if sender else None,
+                            error_message=str(reason) if reason else None, retried=True)
+
+@task_failure.connect
+def on_task_failure(sender=None, task_id=None, exception=None, **extra):
+    task_writer.task_status(task_id, "FAILURE", task_name=sender.name if sender else None,
+                            error_message=repr(exception))
+
+@after_setup_task_logger.connect
+def on_setup_task_logger(logger=None, **kwargs):
+    logger.addHandler(TaskLogHandler())
     
 # Update task reference to match worker's task name
 process_task = celery_app.signature('tasks.process_job_task')
\ No newline at end of file
@@ -0,0 +1,56 @@
+import base64
+from datetime import datetime
+from uuid import uuid4
+from fastapi import HTTPException
+from app.core.config import settings
+from app.db.queries.chat_queries import append_chat_messages, get_chat_messages
+from app.services.chat_cache import get_cached_tail, get_tail_version, fill_tail, push_tail
+
+def encode_cursor(message: dict) -> str:
+    raw = f"{message['created_at'].isoformat()}|{message['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def append_messages(chat_id: str, messages: list):
+    if len(messages) > settings.CHAT_MAX_APPEND_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.CHAT_MAX_APPEND_BATCH} messages can be appended at once"
+        )
+    rows = await append_chat_messages(chat_id, [
+        {"id": message.id or str(uuid4()), "role": message.role, "content": message.content}
+        for message in messages
+    ])
+    await push_tail(chat_id, rows)
+    return rows
+
+async def read_messages(chat_id: str, limit: int, before: str = None):
+    """
+    Return a page of messages, oldest first, plus the cursor for the next older page.
+    The newest page is served from the Redis tail when possible; older pages use
+    keyset pagination so every read costs O(limit), not O(history).
+    """
+    limit = min(limit, settings.CHAT_MAX_PAGE_SIZE)
+    if before:
+        messages = await get_chat_messages(chat_id, limit, decode_cursor(before))
+    else:
+        messages = await get_cached_tail(chat_id, limit)
+        if messages is None:
+            version = await get_tail_version(chat_id)
+            fetch = max(limit, settings.CHAT_CACHE_WINDOW)
+            messages = await get_chat_messages(chat_id, fetch)
+            await fill_tail(
+                chat_id,
+                version,
+                messages,
+                complete=len(messages) < fetch and len(messages) <= settings.CHAT_CACHE_WINDOW
+            )
+            messages = messages[-limit:]
+    next_cursor = encode_cursor(messages[0]) if len(messages) == limit else None
+    return {"messages": messages, "next_cursor": next_cursor}
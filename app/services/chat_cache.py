@@ -0,0 +1,139 @@
+"""
+Redis cache for the hot tail of active chats.
+
+Each chat keeps its last CHAT_CACHE_WINDOW messages in a Redis list, plus a
+`complete` flag when the list holds the chat's entire history and a version
+counter bumped on every append. Fills only land if no append happened while
+the filler was reading Postgres, so a slow reader can never overwrite newer
+messages with a stale window. Every Redis failure degrades to a cache miss;
+an append that fails to reach the tail drops it instead, so the next read
+refills from Postgres rather than serving a tail missing committed messages.
+All calls use the asyncio client, so a slow Redis never blocks the event loop.
+"""
+import json
+from datetime import datetime
+from typing import List, Optional
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.db.redis_client import get_async_redis_client
+
+# KEYS: tail, complete, version | ARGV: window, ttl, messages...
+APPEND_SCRIPT = """
+redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], tonumber(ARGV[2]) * 2)
+if redis.call('EXISTS', KEYS[1]) == 1 or redis.call('EXISTS', KEYS[2]) == 1 then
+    for i = 3, #ARGV do
+        redis.call('RPUSH', KEYS[1], ARGV[i])
+    end
+    redis.call('LTRIM', KEYS[1], -tonumber(ARGV[1]), -1)
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        redis.call('EXPIRE', KEYS[2], ARGV[2])
+    end
+end
+return 1
+"""
+
+# KEYS: tail, complete, version | ARGV: expected version, ttl, complete flag, messages...
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[3]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 4, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+if ARGV[3] == '1' then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+return 1
+"""
+
+_scripts = {}
+
+def _keys(chat_id: str) -> list:
+    # Hash tag keeps all three keys in one slot so the scripts also work on Redis Cluster
+    base = f"chat:{{{chat_id}}}"
+    return [f"{base}:tail", f"{base}:complete", f"{base}:version"]
+
+def _script(name: str, source: str):
+    if name not in _scripts:
+        _scripts[name] = get_async_redis_client().register_script(source)
+    return _scripts[name]
+
+def _dump(message: dict) -> str:
+    return json.dumps({**message, "created_at": message["created_at"].isoformat()})
+
+def _load(raw: str) -> dict:
+    message = json.loads(raw)
+    message["created_at"] = datetime.fromisoformat(message["created_at"])
+    return message
+
+async def get_tail_version(chat_id: str) -> Optional[str]:
+    """Read the version a subsequent fill_tail() must still match, or None if Redis is down"""
+    try:
+        version = await get_async_redis_client().get(_keys(chat_id)[2])
+    except (RedisError, OSError):
+        return None
+    return version or "0"
+
+async def get_cached_tail(chat_id: str, limit: int) -> Optional[List[dict]]:
+    """Return the newest `limit` messages oldest first, or None on a cache miss"""
+    tail_key, complete_key, _ = _keys(chat_id)
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        pipe.llen(tail_key)
+        pipe.exists(complete_key)
+        pipe.lrange(tail_key, -limit, -1)
+        length, complete, raw_messages = await pipe.execute()
+    except (RedisError, OSError):
+        return None
+    # A trimmed list is exactly one window long, so `complete` only counts below that
+    if length >= limit or (complete and length < settings.CHAT_CACHE_WINDOW):
+        return [_load(raw) for raw in raw_messages]
+    return None
+
+async def fill_tail(chat_id: str, version: Optional[str], messages: List[dict], complete: bool):
+    """Populate the cache with the newest window of messages read from Postgres"""
+    if version is None:
+        return
+    window = messages[-settings.CHAT_CACHE_WINDOW:]
+    try:
+        await _script("fill", FILL_SCRIPT)(
+            keys=_keys(chat_id),
+            args=[version, settings.CHAT_CACHE_TTL_SECONDS, "1" if complete else "0"]
+                 + [_dump(message) for message in window]
+        )
+    except (RedisError, OSError):
+        pass
+
+async def push_tail(chat_id: str, messages: List[dict]):
+    """Append freshly committed messages to a cached tail, if one exists"""
+    if not messages:
+        return
+    try:
+        await _script("append", APPEND_SCRIPT)(
+            keys=_keys(chat_id),
+            args=[settings.CHAT_CACHE_WINDOW, settings.CHAT_CACHE_TTL_SECONDS]
+                 + [_dump(message) for message in messages]
+        )
+    except (RedisError, OSError) as e:
+        await drop_tail(chat_id, e)
+
+async def drop_tail(chat_id: str, reason: Exception):
+    """
+    Best effort after a failed append: delete the tail and bump the version so
+    neither the stale tail nor a fill that started before the append survives
+    """
+    tail_key, complete_key, version_key = _keys(chat_id)
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        pipe.delete(tail_key, complete_key)
+        pipe.incr(version_key)
+        pipe.expire(version_key, settings.CHAT_CACHE_TTL_SECONDS * 2)
+        await pipe.execute()
+    except (RedisError, OSError) as e:
+        print(f"❌ Chat cache for {chat_id} may be stale for up to {settings.CHAT_CACHE_TTL_SECONDS}s: {reason}; {e}")
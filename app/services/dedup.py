@@ -0,0 +1,72 @@
+"""
+Near-duplicate detection for scraped jobs.
+
+Each job is reduced to word shingles over its normalised title, company and
+description, and summarised as a MinHash signature of NUM_PERM values. The
+signature is split into BANDS bands; jobs sharing any band hash are LSH
+candidates, and a candidate becomes the canonical match when the estimated
+Jaccard similarity clears DEDUP_THRESHOLD.
+
+NUM_PERM, BANDS and the permutation seed are part of the stored format:
+changing them invalidates every signature in job_minhash.
+"""
+import hashlib
+import re
+import numpy as np
+from app.core.config import settings
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# a, b < 2**32 and 32-bit shingle hashes keep a * h + b inside uint64
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def normalize(text: str) -> list:
+    return _NON_WORD.sub(" ", (text or "").lower()).split()
+
+def shingles(job: dict, size: int = None) -> set:
+    """Word shingles of the description, plus whole title and company tokens"""
+    size = size or settings.DEDUP_SHINGLE_SIZE
+    words = normalize(job.get("description"))
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    grams.add("title:" + " ".join(normalize(job.get("title"))))
+    grams.add("company:" + " ".join(normalize(job.get("company"))))
+    grams.discard("")
+    return grams
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "little")
+
+def minhash(job: dict) -> np.ndarray:
+    """Return the job's MinHash signature as NUM_PERM uint32 values"""
+    hashes = np.fromiter((_hash32(s) for s in shingles(job)), dtype=np.uint64)
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % MERSENNE_PRIME
+    return (permuted.min(axis=1) & MAX_HASH).astype(np.uint32)
+
+def band_hashes(signature: np.ndarray) -> list:
+    """One signed 64-bit hash per band, suitable for a BIGINT column"""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True
+        )
+        for band in range(BANDS)
+    ]
+
+def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity between one signature and each row of `others`"""
+    return (others == signature).mean(axis=1)
+
+def to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+def from_bytes(raw) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype="<u4")
@@ -0,0 +1,93 @@
+"""
+Long-text encoding.
+
+Texts longer than the model's max sequence length are split into overlapping
+token windows instead of being silently truncated. The windows are fed to the
+model as token ids rather than decoded back to text: a decoded WordPiece
+window can start with a literal "##piece" and [UNK] does not round-trip, so
+re-tokenizing it would no longer match the counted tokens and could overflow
+the window. All windows from a request
+are sorted by token length and encoded in buckets of similar length, so a
+batch is only padded to its own longest window rather than to the longest
+input overall. Window vectors are then pooled back into one embedding per text.
+"""
+import numpy as np
+from app.core.config import settings
+from app.core.metrics import ENCODE_BATCH_SIZE, ENCODE_DURATION, observe, timed
+
+def job_text(job: dict) -> str:
+    """The text a processed job is embedded from"""
+    return "\n".join(filter(None, (job.get("title"), job.get("company"), job.get("location"), job.get("description"))))
+
+def token_windows(tokenizer, text: str, window: int, overlap: int):
+    """Split `text` into token-id windows of at most `window` tokens overlapping by `overlap`"""
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(ids) <= window:
+        return [ids], len(ids)
+    stride = window - overlap
+    windows = [ids[start:start + window] for start in range(0, len(ids) - overlap, stride)]
+    return windows, len(ids)
+
+def special_tokens(tokenizer):
+    """The (prefix, suffix) special token ids the tokenizer wraps a single text in, e.g. [CLS] ... [SEP]"""
+    bare = tokenizer.encode("a", add_special_tokens=False)
+    wrapped = tokenizer.encode("a", add_special_tokens=True)
+    start = next(i for i in range(len(wrapped)) if wrapped[i:i + len(bare)] == bare)
+    return wrapped[:start], wrapped[start + len(bare):]
+
+def encode_token_windows(model, windows: list, prefix: list, suffix: list) -> np.ndarray:
+    """Embed token-id windows exactly as given, wrapped only in the model's special tokens"""
+    import torch
+    features = model.tokenizer.pad({"input_ids": [prefix + ids + suffix for ids in windows]}, return_tensors="pt")
+    features = {name: tensor.to(model.device) for name, tensor in features.items()}
+    model.eval()
+    with torch.inference_mode():
+        return model(features)["sentence_embedding"].float().cpu().numpy()
+
+def encode_long_texts(model, texts: list, pooling: str = "weighted", batch_size: int = None, model_name: str = "") -> list:
+    """
+    Encode each text as the pooled embedding of its token windows.
+    `pooling` is "mean" (every window counts equally) or "weighted" (by window token count).
+    Returns one {"embedding", "token_count", "chunks"} dict per input text.
+    """
+    batch_size = batch_size or settings.ENCODE_BATCH_SIZE
+    tokenizer = model.tokenizer
+    # Leave room for the [CLS]/[SEP] tokens added to every window
+    prefix, suffix = special_tokens(tokenizer)
+    window = model.get_max_seq_length() - len(prefix) - len(suffix)
+    overlap = min(settings.ENCODE_WINDOW_OVERLAP, window // 2)
+
+    owners, all_windows, window_lengths, token_counts = [], [], [], []
+    for index, text in enumerate(texts):
+        windows, token_count = token_windows(tokenizer, text, window, overlap)
+        token_counts.append(token_count)
+        for ids in windows:
+            owners.append(index)
+            all_windows.append(ids)
+            window_lengths.append(len(ids))
+
+    order = np.argsort(window_lengths, kind="stable")
+    vectors = None
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        observe(ENCODE_BATCH_SIZE, len(bucket), model=model_name)
+        with timed(ENCODE_DURATION, model=model_name):
+            encoded = encode_token_windows(model, [all_windows[i] for i in bucket], prefix, suffix)
+        if vectors is None:
+            vectors = np.empty((len(order), encoded.shape[1]), dtype=np.float32)
+        vectors[bucket] = encoded
+
+    owners = np.asarray(owners)
+    lengths = np.asarray(window_lengths, dtype=np.float32)
+    results = []
+    for index, token_count in enumerate(token_counts):
+        rows = np.flatnonzero(owners == index)
+        weights = np.maximum(lengths[rows], 1.0) if pooling == "weighted" else None
+        pooled = np.average(vectors[rows], axis=0, weights=weights)
+        norm = np.linalg.norm(pooled)
+        results.append({
+            "embedding": (pooled / norm if norm else pooled).tolist(),
+            "token_count": token_count,
+            "chunks": len(rows),
+        })
+    return results
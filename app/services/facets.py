@@ -0,0 +1,39 @@
+"""
+Short-TTL, per-process cache in front of the facet views.
+
+Facet results are the same for every caller and only change when the views are
+refreshed, so each worker keeps the last result per key for
+FACETS_CACHE_TTL_SECONDS. Concurrent misses for the same key share a single
+query instead of stampeding Postgres when an entry expires. Keys are the
+facet `limit`, which the API caps at FACETS_MAX_VALUES, so the cache is bounded.
+"""
+import asyncio
+import time
+from app.core.config import settings
+from app.db.queries.facet_queries import get_job_facets, get_task_summary
+
+_cache = {}  # limit -> (expires at, value)
+_locks = {}  # limit -> asyncio.Lock
+
+async def _cached(key, load):
+    entry = _cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    lock = _locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        value = await load()
+        _cache[key] = (time.monotonic() + settings.FACETS_CACHE_TTL_SECONDS, value)
+        return value
+
+async def job_facets(limit: int) -> dict:
+    return await _cached(limit, lambda: get_job_facets(limit))
+
+async def task_summary(task_id: str):
+    """
+    Not cached: task ids come from the URL, so a per-process cache would grow
+    without bound, and the lookup is a single unique-index probe anyway
+    """
+    return await get_task_summary(task_id)
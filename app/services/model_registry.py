@@ -0,0 +1,146 @@
+"""
+Registry of embedding models with memory-bounded residency.
+
+Only models listed in EMBEDDING_MODEL / EMBEDDING_MODELS may be loaded. A model
+loads on first use and stays resident until loading another would push the
+total weight size past EMBEDDING_MODELS_RAM_BUDGET_MB, at which point the least
+recently used models are dropped. Eviction happens before the new model is
+loaded, using its size from an earlier load, else the size of its weight files
+on local disk, else the largest resident model's, so the budget holds during
+the swap too. The default model is loaded eagerly and never evicted, so the
+common path never pays a cold start (and, when preloaded before forking, its
+weights stay shared across workers); its size still counts against the
+budget, leaving the rest for the other models.
+"""
+import gc
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+
+def parse_model_list(spec: str) -> dict:
+    """Parse "alias=org/model,org/other" into {name: model id}"""
+    models = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        alias, _, model_id = entry.partition("=")
+        models[alias.strip()] = (model_id or alias).strip()
+    return models
+
+def model_size_bytes(model) -> int:
+    try:
+        tensors = itertools.chain(model.parameters(), model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except AttributeError:
+        return 0
+
+WEIGHT_SUFFIXES = (".safetensors", ".bin", ".pt", ".onnx")
+
+def weights_on_disk(model_id: str) -> int:
+    """Bytes of weight files for a local path or an already-downloaded hub model; 0 if unknown"""
+    path = model_id
+    if not os.path.isdir(path):
+        try:
+            from huggingface_hub import snapshot_download
+            path = snapshot_download(model_id, local_files_only=True)
+        except Exception:
+            return 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            if file.endswith(WEIGHT_SUFFIXES):
+                total += os.path.getsize(os.path.join(root, file))
+    return total
+
+class ModelRegistry:
+    def __init__(self, default_model: str, extra_models: str, budget_mb: int):
+        self.default = default_model
+        self.allowed = {default_model: default_model, **parse_model_list(extra_models)}
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.resident = OrderedDict()  # name -> (model, size in bytes), least recently used first
+        self.sizes = {}  # name -> size in bytes measured at its last load, kept after eviction
+        self.lock = threading.Lock()
+        self.loading = {}  # name -> Lock, so concurrent requests for a cold model load it once
+
+    def resolve(self, name: str = None) -> str:
+        name = name or self.default
+        if name not in self.allowed:
+            raise KeyError(f"Unknown model '{name}'. Available: {', '.join(sorted(self.allowed))}")
+        return name
+
+    def get(self, name: str = None):
+        """Return the loaded model, loading (and evicting) as needed; blocks while loading"""
+        name = self.resolve(name)
+        with self.lock:
+            if name in self.resident:
+                self.resident.move_to_end(name)
+                return self.resident[name][0]
+            load_lock = self.loading.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self.lock:
+                if name in self.resident:
+                    self.resident.move_to_end(name)
+                    return self.resident[name][0]
+            expected = self.sizes.get(name) or weights_on_disk(self.allowed[name])
+            with self.lock:
+                # Unknown size: assume it is as big as the largest resident model
+                self.evict(reserve=expected or max((size for _, size in self.resident.values()), default=0))
+            print(f"Loading embedding model {name} ({self.allowed[name]})")
+            model = SentenceTransformer(self.allowed[name])
+            size = model_size_bytes(model)
+            with self.lock:
+                self.sizes[name] = size
+                self.resident[name] = (model, size)
+                # In case the estimate was low
+                self.evict(keep=name)
+                self.loading.pop(name, None)
+            return model
+
+    def is_loaded(self, name: str = None) -> bool:
+        return self.resolve(name) in self.resident
+
+    def evict(self, keep: str = None, reserve: int = 0):
+        """
+        Drop least recently used models (other than `keep` and the default)
+        until the resident models plus `reserve` bytes fit the budget; caller
+        holds self.lock
+        """
+        evicted = False
+        while self.resident_bytes() + reserve > self.budget_bytes:
+            name = next((n for n in self.resident if n not in (keep, self.default)), None)
+            if name is None:
+                break
+            del self.resident[name]
+            evicted = True
+            print(f"Evicted embedding model {name} to stay within the RAM budget")
+        if evicted:
+            gc.collect()
+
+    def resident_bytes(self) -> int:
+        return sum(size for _, size in self.resident.values())
+
+    def dimension(self, name: str = None) -> int:
+        return self.get(name).get_sentence_embedding_dimension()
+
+    def describe(self) -> list:
+        with self.lock:
+            resident = dict(self.resident)
+        return [
+            {
+                "name": name,
+                "model_id": model_id,
+                "default": name == self.default,
+                "loaded": name in resident,
+                "dimension": resident[name][0].get_sentence_embedding_dimension() if name in resident else None,
+                "resident_mb": round(resident[name][1] / (1024 * 1024), 1) if name in resident else None,
+            }
+            for name, model_id in self.allowed.items()
+        ]
+
+registry = ModelRegistry(
+    default_model=settings.EMBEDDING_MODEL,
+    extra_models=settings.EMBEDDING_MODELS,
+    budget_mb=settings.EMBEDDING_MODELS_RAM_BUDGET_MB
+)
@@ -0,0 +1,158 @@
+"""
+Background parsing of uploaded resumes into the structured resume columns.
+
+Text extraction and sectioning run on a small process pool
+(RESUME_PARSE_WORKERS per API process), so a large or pathological PDF never
+holds the event loop or the GIL of the worker serving requests. The pool is
+created on first use and spawns fresh interpreters instead of forking, since
+the API worker has threads, DB and Redis sockets and torch state that a fork
+would copy mid-flight.
+
+A resume stays 'pending' until its parse lands, then becomes 'active'. A
+failed parse records parse_error and leaves the row pending; re-uploading the
+same file retries it. Every scheduled parse holds a lease (parse_claimed_at).
+A parse that never reports back (cancelled by a restart, or its process
+crashed) is picked up again once the lease expires: each API worker re-claims
+expired leases at startup and every RESUME_PARSE_LEASE_SECONDS after, and a
+re-upload re-claims it straight away. Claims skip rows another worker holds,
+so with several API workers each resume is parsed once.
+"""
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from app.core.config import settings
+from app.db.queries.resume_queries import claim_unparsed_resumes, complete_resume_parse, fail_resume_parse
+
+SECTION_HEADINGS = {
+    "education": ("education", "academic background", "academics"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history"),
+    "projects": ("projects", "personal projects", "academic projects"),
+    "technical_skills": ("skills", "technical skills", "technologies", "tech stack"),
+    "certifications_achievements": (
+        "certifications", "achievements", "awards", "certifications and achievements",
+        "certifications & achievements", "achievements & certifications",
+    ),
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+LINKEDIN = re.compile(r"(?:https?://)?(?:www\.)?linkedin\.com/in/[\w-]+/?", re.I)
+GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+/?", re.I)
+BULLET = re.compile(r"^\s*[•▪◦●*\-–]\s*")
+
+def extract_text(path: str, file_type: str) -> str:
+    if file_type == "pdf":
+        from pypdf import PdfReader
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    if file_type == "docx":
+        import docx
+        return "\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs)
+    return Path(path).read_text(encoding="utf-8", errors="replace")
+
+def _heading(line: str):
+    return _HEADING_LOOKUP.get(re.sub(r"[^a-z& ]+", "", line.lower()).strip())
+
+def parse_resume_text(text: str) -> dict:
+    """Split resume text into personal info and the JSONB sections"""
+    lines = [line.strip() for line in text.splitlines()]
+    sections = {section: [] for section in SECTION_HEADINGS}
+    header, current = [], None
+    for line in lines:
+        section = _heading(line) if line else None
+        if section:
+            current = section
+        elif current is None:
+            header.append(line)
+        else:
+            sections[current].append(line)
+
+    def entries(section_lines: list) -> list:
+        # Blank lines separate entries; bullets belong to the entry above them
+        result, entry = [], None
+        for line in section_lines:
+            if not line:
+                entry = None
+            elif BULLET.match(line) and entry is not None:
+                entry["details"].append(BULLET.sub("", line))
+            elif entry is None:
+                entry = {"heading": BULLET.sub("", line), "details": []}
+                result.append(entry)
+            else:
+                entry["details"].append(BULLET.sub("", line))
+        return result
+
+    skills = [
+        skill.strip()
+        for line in sections.pop("technical_skills")
+        for skill in re.split(r"[,|;•]", line.split(":", 1)[-1])
+        if skill.strip()
+    ]
+    joined = "\n".join(header) or text
+    email, phone = EMAIL.search(joined), PHONE.search(joined)
+    linkedin, github = LINKEDIN.search(text), GITHUB.search(text)
+    name = next((line for line in header if line and not EMAIL.search(line) and not PHONE.search(line)), "")
+    return {
+        "personal_info_name": name,
+        "personal_info_phone": phone.group(0) if phone else "",
+        "personal_info_email": email.group(0) if email else "",
+        "personal_info_linkedin": linkedin.group(0) if linkedin else None,
+        "personal_info_github": github.group(0) if github else None,
+        "technical_skills": skills,
+        **{section: entries(section_lines) for section, section_lines in sections.items()},
+    }
+
+def parse_resume_file(path: str, file_type: str) -> dict:
+    """Runs in a pool process"""
+    text = extract_text(path, file_type)
+    if not text.strip():
+        raise ValueError("No text could be extracted from the file")
+    return parse_resume_text(text)
+
+_executor = None
+_tasks = set()  # keeps scheduled parses alive until they finish
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.RESUME_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+async def _parse(resume_id: int, path: str, file_type: str):
+    loop = asyncio.get_running_loop()
+    try:
+        parsed = await loop.run_in_executor(_get_executor(), parse_resume_file, path, file_type)
+    except Exception as e:
+        await fail_resume_parse(resume_id, f"{type(e).__name__}: {e}"[:1000])
+        return
+    await complete_resume_parse(resume_id, parsed)
+
+def schedule_parse(resume_id: int, path: str, file_type: str):
+    task = asyncio.get_running_loop().create_task(_parse(resume_id, path, file_type))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+async def requeue_unparsed_resumes() -> int:
+    """Claim and schedule pending resumes with a file, no recorded failure and no live lease"""
+    resumes = await claim_unparsed_resumes(settings.RESUME_PARSE_LEASE_SECONDS)
+    for resume in resumes:
+        schedule_parse(resume["id"], resume["file_path"], resume["file_type"])
+    return len(resumes)
+
+async def requeue_unparsed_resumes_periodically(interval: float):
+    """Re-claim parses whose lease expired, every `interval` seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await requeue_unparsed_resumes()
+        except Exception as e:
+            print(f"❌ Requeueing unparsed resumes failed: {e}")
+
+def shutdown_parser():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
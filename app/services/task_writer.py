@@ -0,0 +1,207 @@
+"""
+Write-behind buffer for celery_tasks status transitions and task_logs rows.
+
+Callers (API handlers, Celery signal handlers, the task log handler) only
+append to memory; a background thread flushes everything in one transaction
+with multi-row statements whenever TASK_WRITER_BATCH_SIZE log lines are
+buffered or TASK_WRITER_FLUSH_INTERVAL_SECONDS has passed, and once more on
+shutdown. Status updates for the same task are merged before they are written,
+so a task's whole lifecycle usually costs a single upsert.
+
+Memory is bounded: status entries are one per in-flight task, and log lines
+beyond TASK_WRITER_MAX_BUFFER are dropped (and counted) rather than queued.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from psycopg2.extras import Json, execute_values
+from app.core.config import settings
+from app.db.connection import get_db_connection
+
+# A late PENDING write (e.g. from the API) must not roll back a task the worker already started
+UPSERT_TASKS = """
+INSERT INTO celery_tasks AS t
+    (task_id, task_name, status, task_args, started_at, completed_at, error_message, retries, last_retry_at)
+VALUES %s
+ON CONFLICT (task_id) DO UPDATE SET
+    status = CASE WHEN EXCLUDED.status = 'PENDING' THEN t.status ELSE EXCLUDED.status END,
+    task_args = CASE WHEN EXCLUDED.task_args = '{}'::jsonb THEN t.task_args ELSE EXCLUDED.task_args END,
+    started_at = COALESCE(t.started_at, EXCLUDED.started_at),
+    completed_at = COALESCE(EXCLUDED.completed_at, t.completed_at),
+    error_message = COALESCE(EXCLUDED.error_message, t.error_message),
+    retries = t.retries + EXCLUDED.retries,
+    last_retry_at = COALESCE(EXCLUDED.last_retry_at, t.last_retry_at)
+"""
+
+INSERT_LOGS = """
+INSERT INTO task_logs (task_pk_id, task_uuid, log_level, message, created_at)
+SELECT t.id, v.task_uuid, v.log_level, v.message, v.created_at
+FROM (VALUES %s) AS v(seq, task_uuid, log_level, message, created_at)
+LEFT JOIN celery_tasks t ON t.task_id = v.task_uuid
+ORDER BY v.seq
+"""
+
+def merge_status(current: dict, update: dict) -> dict:
+    if current is None:
+        return update
+    merged = dict(current)
+    if update["status"] != "PENDING" or current["status"] == "PENDING":
+        merged["status"] = update["status"]
+    merged["task_name"] = current["task_name"] or update["task_name"]
+    merged["task_args"] = update["task_args"] or current["task_args"]
+    merged["started_at"] = current["started_at"] or update["started_at"]
+    merged["completed_at"] = update["completed_at"] or current["completed_at"]
+    merged["error_message"] = update["error_message"] or current["error_message"]
+    merged["retries"] = current["retries"] + update["retries"]
+    merged["last_retry_at"] = update["last_retry_at"] or current["last_retry_at"]
+    return merged
+
+class TaskWriteBehind:
+    def __init__(self, flush_interval: float, batch_size: int, max_buffer: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.statuses = {}
+        self.logs = deque()
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.pid = None
+        self.closed = False
+
+    def _ensure_started(self):
+        # Celery's prefork pool forks after import, so each process starts its own flusher
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.pid = os.getpid()
+                    self.closed = False
+                    self.thread = threading.Thread(target=self._run, name="task-write-behind", daemon=True)
+                    self.thread.start()
+
+    def task_status(self, task_id: str, status: str, task_name: str = None, task_args: dict = None,
+                    error_message: str = None, retried: bool = False):
+        """Record a status transition; timestamps are taken now, not at flush time"""
+        now = datetime.utcnow()
+        update = {
+            "task_id": task_id,
+            "task_name": task_name,
+            "status": status,
+            "task_args": task_args or {},
+            "started_at": now if status == "PROCESSING" else None,
+            "completed_at": now if status in ("SUCCESS", "FAILURE") else None,
+            "error_message": error_message,
+            "retries": 1 if retried else 0,
+            "last_retry_at": now if retried else None,
+        }
+        self._ensure_started()
+        with self.lock:
+            self.statuses[task_id] = merge_status(self.statuses.get(task_id), update)
+
+    def log(self, task_id: str, level: str, message: str):
+        self._ensure_started()
+        with self.lock:
+            if len(self.logs) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self.logs.append((task_id, level, message, datetime.utcnow()))
+            full = len(self.logs) >= self.batch_size
+        if full:
+            self.wake.set()
+
+    def _run(self):
+        while not self.closed:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Task write-behind flush failed: {e}")
+
+    def flush(self):
+        """Write everything buffered so far in one transaction"""
+        with self.flush_lock:
+            with self.lock:
+                statuses, self.statuses = self.statuses, {}
+                logs = [self.logs.popleft() for _ in range(len(self.logs))]
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                logs.append((None, "WARNING", f"task write-behind buffer full; dropped {dropped} log lines", datetime.utcnow()))
+            if not statuses and not logs:
+                return
+            try:
+                self._write(statuses, logs)
+            except Exception:
+                self._requeue(statuses, logs)
+                raise
+
+    def _write(self, statuses: dict, logs: list):
+        with get_db_connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    if statuses:
+                        execute_values(cur, UPSERT_TASKS, [
+                            (
+                                s["task_id"], s["task_name"] or "unknown", s["status"], Json(s["task_args"]),
+                                s["started_at"], s["completed_at"], s["error_message"], s["retries"], s["last_retry_at"],
+                            )
+                            for s in statuses.values()
+                        ], page_size=len(statuses))
+                    if logs:
+                        # seq keeps task_logs ids in the order the lines were logged
+                        execute_values(
+                            cur,
+                            INSERT_LOGS,
+                            [(seq,) + line for seq, line in enumerate(logs)],
+                            template="(%s, %s, %s, %s, %s::timestamp)",
+                            page_size=1000
+                        )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _requeue(self, statuses: dict, logs: list):
+        """Put a failed batch back, still respecting the buffer bound"""
+        with self.lock:
+            for task_id, status in statuses.items():
+                newer = self.statuses.get(task_id)
+                self.statuses[task_id] = merge_status(status, newer) if newer else status
+            room = self.max_buffer - len(self.logs)
+            self.logs.extendleft(reversed(logs[:max(room, 0)]))
+            self.dropped += max(len(logs) - max(room, 0), 0)
+
+    def close(self):
+        """Stop the flusher and write whatever is still buffered"""
+        self.closed = True
+        self.wake.set()
+        if self.thread is not None and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ Final task write-behind flush failed: {e}")
+
+class TaskLogHandler(logging.Handler):
+    """Route Celery task logger records into task_logs through the write-behind buffer"""
+
+    def emit(self, record):
+        try:
+            from celery import current_task
+            task_id = current_task.request.id if current_task else None
+            if task_id:
+                task_writer.log(task_id, record.levelname, self.format(record))
+        except Exception:
+            self.handleError(record)
+
+task_writer = TaskWriteBehind(
+    flush_interval=settings.TASK_WRITER_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.TASK_WRITER_BATCH_SIZE,
+    max_buffer=settings.TASK_WRITER_MAX_BUFFER
+)
+atexit.register(task_writer.close)
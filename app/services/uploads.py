@@ -0,0 +1,149 @@
+"""
+Streaming multipart uploads.
+
+The request body is fed chunk by chunk into python-multipart's push parser, and
+file data goes straight to a temporary file on disk (written off the event
+loop) while being hashed. Memory use is bounded by the size of one network
+chunk no matter how big the upload is, and the size limit is enforced while
+streaming, so an oversized body is rejected without being stored. The whole
+body is capped too (file plus MAX_OVERHEAD_BYTES of form fields and headers,
+in at most MAX_PARTS parts), since a chunked request has no Content-Length.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    # python-multipart < 0.0.13
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_FIELD_BYTES = 4096
+MAX_PARTS = 16
+MAX_OVERHEAD_BYTES = 64 * 1024  # body bytes allowed beyond the file itself
+
+class UploadError(ValueError):
+    pass
+
+class UploadTooLarge(UploadError):
+    pass
+
+class _Part:
+    def __init__(self):
+        self.header_field = bytearray()
+        self.header_value = bytearray()
+        self.headers = {}
+        self.name = None
+        self.filename = None
+        self.value = bytearray()
+
+async def receive_upload(request, directory: str, max_bytes: int, file_field: str = "file",
+                         allowed_extensions: tuple = None) -> dict:
+    """
+    Stream a multipart/form-data request with one file part into `directory`.
+    Returns {"fields", "filename", "extension", "content_type", "path", "size", "sha256"};
+    `path` is a temporary file the caller must move or delete.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Expected a multipart/form-data body")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MAX_OVERHEAD_BYTES:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    pending = bytearray()  # file bytes parsed from the current chunk, written once the chunk is done
+    fields = {}
+    upload = {"filename": None, "extension": None, "content_type": None, "size": 0}
+    part = None
+    parts = 0
+
+    def on_part_begin():
+        nonlocal part, parts
+        parts += 1
+        if parts > MAX_PARTS:
+            raise UploadError(f"At most {MAX_PARTS} form fields are allowed")
+        part = _Part()
+
+    def on_header_field(data, start, end):
+        part.header_field += data[start:end]
+
+    def on_header_value(data, start, end):
+        part.header_value += data[start:end]
+
+    def on_header_end():
+        part.headers[bytes(part.header_field).lower()] = bytes(part.header_value)
+        part.header_field.clear()
+        part.header_value.clear()
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part.headers.get(b"content-disposition", b""))
+        part.name = disposition.get(b"name", b"").decode("utf-8", "replace")
+        filename = disposition.get(b"filename")
+        if filename is None:
+            return
+        if part.name != file_field or upload["filename"] is not None:
+            raise UploadError(f"Expected exactly one file in the '{file_field}' field")
+        part.filename = Path(filename.decode("utf-8", "replace")).name
+        extension = Path(part.filename).suffix.lower().lstrip(".")
+        if allowed_extensions and extension not in allowed_extensions:
+            raise UploadError(f"Unsupported file type '{extension}'. Allowed: {', '.join(allowed_extensions)}")
+        upload.update(
+            filename=part.filename,
+            extension=extension,
+            content_type=part.headers.get(b"content-type", b"").decode("latin-1") or None
+        )
+
+    def on_part_data(data, start, end):
+        if part.filename is None:
+            part.value += data[start:end]
+            if len(part.value) > MAX_FIELD_BYTES:
+                raise UploadError(f"Field '{part.name}' is too long")
+            return
+        upload["size"] += end - start
+        if upload["size"] > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(data[start:end])
+        pending.extend(data[start:end])
+
+    def on_part_end():
+        if part.filename is None and part.name:
+            fields[part.name] = part.value.decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes + MAX_OVERHEAD_BYTES:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            parser.write(chunk)
+            if pending:
+                await asyncio.to_thread(out.write, bytes(pending))
+                pending.clear()
+        parser.finalize()
+        out.close()
+        if upload["filename"] is None:
+            raise UploadError(f"Missing file field '{file_field}'")
+    except Exception as e:
+        out.close()
+        os.unlink(tmp_path)
+        if isinstance(e, MultipartParseError):
+            raise UploadError(f"Malformed multipart body: {e}") from e
+        raise
+    return {**upload, "fields": fields, "path": tmp_path, "sha256": digest.hexdigest()}
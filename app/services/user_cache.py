@@ -0,0 +1,104 @@
+"""
+Read-through Redis cache for public user profiles (id, username, email, name).
+
+Profiles are cached under both lookup keys, by username and by email. Misses
+are cached too, as "null" with a shorter TTL, so probing unknown usernames
+does not reach Postgres each time. Within a process, concurrent lookups of the
+same key share one in-flight load (an asyncio future), so a burst for a
+popular profile costs one query.
+
+Writes call invalidate_user(), which deletes the entries and bumps a per-key
+version; a load only fills the cache if the version it read first is still
+current, so a read racing a write can never cache the pre-write profile.
+Redis failures fall back to Postgres.
+"""
+import asyncio
+import json
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.db.redis_client import get_async_redis_client
+
+# KEYS: entry, version | ARGV: expected version, ttl, value
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+_fill = None
+_inflight = {}  # (field, value) -> asyncio.Future
+
+def _keys(field: str, value: str) -> list:
+    base = f"user:{{{field}:{value}}}"
+    return [f"{base}:profile", f"{base}:version"]
+
+async def _read(field: str, value: str):
+    """(hit, profile, version); version is None when Redis is unavailable"""
+    entry_key, version_key = _keys(field, value)
+    try:
+        raw, version = await get_async_redis_client().mget(entry_key, version_key)
+    except (RedisError, OSError):
+        return False, None, None
+    if raw is not None:
+        return True, json.loads(raw), version or "0"
+    return False, None, version or "0"
+
+async def _write(field: str, value: str, version: str, profile):
+    global _fill
+    ttl = settings.USER_CACHE_TTL_SECONDS if profile else settings.USER_CACHE_NEGATIVE_TTL_SECONDS
+    try:
+        if _fill is None:
+            _fill = get_async_redis_client().register_script(FILL_SCRIPT)
+        await _fill(keys=_keys(field, value), args=[version, ttl, json.dumps(profile)])
+    except (RedisError, OSError):
+        pass
+
+async def _load(field: str, value: str, loader):
+    hit, profile, version = await _read(field, value)
+    if hit:
+        return profile
+    row = await loader(value)
+    profile = {"id": row["id"], "username": row["username"], "email": row["email"], "name": row["name"]} if row else None
+    if version is not None:
+        await _write(field, value, version, profile)
+    return profile
+
+async def cached_profile(field: str, value: str, loader):
+    """
+    The profile whose `field` ("username" or "email") equals `value`, or None.
+    `loader(value)` is the query to run on a miss.
+    """
+    key = (field, value)
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        profile = await _load(field, value, loader)
+        future.set_result(profile)
+        return profile
+    except Exception as e:
+        future.set_exception(e)
+        # Waiters get the exception; mark it retrieved so an unawaited future does not warn
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+async def invalidate_user(username: str = None, email: str = None):
+    """Drop cached profiles (and cached misses) for a user after a write"""
+    lookups = [("username", username), ("email", email)]
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        for field, value in lookups:
+            if value:
+                entry_key, version_key = _keys(field, value)
+                pipe.incr(version_key)
+                pipe.expire(version_key, settings.USER_CACHE_TTL_SECONDS * 2)
+                pipe.delete(entry_key)
+        await pipe.execute()
+    except (RedisError, OSError) as e:
+        print(f"❌ User cache invalidation failed: {e}")
@@ -0,0 +1,159 @@
+"""
+Compressed in-memory tier for job vectors.
+
+A product quantizer splits each D-dimensional vector into `m` sub-vectors and
+replaces each one with the id of its nearest of 256 centroids (trained with
+k-means per subspace), so a vector costs `m` bytes instead of 4 * D. With the
+defaults (384 dims, m=48) that is 48 bytes instead of 1536, 32x smaller.
+
+Search is asymmetric: the query stays full precision. For each subspace its
+dot product with all 256 centroids goes into an (m, 256) lookup table, and a
+stored vector's approximate score is the sum of m table entries picked by its
+codes. The top `k * rerank` candidates are then re-scored exactly against
+the full-precision vectors, which can stay on disk (np.memmap), since only a
+few hundred rows are read per query.
+
+Scores are inner products; embeddings are L2-normalised, so that is cosine
+similarity.
+"""
+import json
+from pathlib import Path
+import numpy as np
+
+KS = 256  # centroids per subspace, so every code fits in a uint8
+
+def _kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.RandomState) -> np.ndarray:
+    """Lloyd's k-means; empty clusters are re-seeded from random points"""
+    centroids = data[rng.choice(len(data), k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        assignments = _nearest(data, centroids)
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        centroids[empty] = data[rng.choice(len(data), int(empty.sum()))]
+    return centroids
+
+def _nearest(data: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    """Index of the nearest centroid (L2) for each row, in chunks to bound memory"""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    out = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), chunk):
+        block = data[start:start + chunk]
+        out[start:start + chunk] = np.argmin(centroid_norms[None, :] - 2 * block @ centroids.T, axis=1)
+    return out
+
+class ProductQuantizer:
+    def __init__(self, dimension: int, m: int = 48):
+        if dimension % m:
+            raise ValueError(f"Dimension {dimension} is not divisible by m={m}")
+        self.dimension = dimension
+        self.m = m
+        self.dsub = dimension // m
+        self.centroids = None  # (m, KS, dsub)
+
+    def train(self, vectors: np.ndarray, iterations: int = 20, sample: int = 50000, seed: int = 0):
+        rng = np.random.RandomState(seed)
+        if len(vectors) > sample:
+            vectors = vectors[rng.choice(len(vectors), sample, replace=False)]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.centroids = np.stack([
+            _kmeans(vectors[:, j * self.dsub:(j + 1) * self.dsub], KS, iterations, rng)
+            for j in range(self.m)
+        ])
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _nearest(vectors[:, j * self.dsub:(j + 1) * self.dsub], self.centroids[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.concatenate([self.centroids[j][codes[:, j]] for j in range(self.m)], axis=1)
+
+    def lookup_tables(self, query: np.ndarray) -> np.ndarray:
+        """(m, KS) inner products between each query sub-vector and its subspace's centroids"""
+        return np.einsum("mkd,md->mk", self.centroids, query.reshape(self.m, self.dsub).astype(np.float32))
+
+class CompressedVectorIndex:
+    def __init__(self, pq: ProductQuantizer, ids: np.ndarray, codes: np.ndarray, vectors: np.ndarray = None):
+        self.pq = pq
+        self.ids = ids
+        # Stored subspace-major (m, n) so each lookup pass gathers from one contiguous row
+        self.codes = np.ascontiguousarray(codes.T)
+        self.vectors = vectors  # full precision, for re-ranking; may be an np.memmap
+
+    @classmethod
+    def build(cls, ids, vectors: np.ndarray, m: int = 48, iterations: int = 20, sample: int = 50000):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            raise ValueError("Cannot build an index from zero vectors")
+        pq = ProductQuantizer(vectors.shape[1], m).train(vectors, iterations, sample)
+        return cls(pq, np.asarray(ids, dtype=np.int64), pq.encode(vectors), vectors)
+
+    def adc_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate inner product of `query` with every stored vector"""
+        tables = self.pq.lookup_tables(query)
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for j in range(self.pq.m):
+            scores += tables[j].take(self.codes[j])
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 10, rerank: int = 10) -> list:
+        """
+        Top-k (id, score) pairs. With rerank > 0 and full vectors available, the
+        best k * rerank approximate matches are re-scored exactly.
+        """
+        if not len(self.ids) or k <= 0 or self.pq.centroids is None:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        scores = self.adc_scores(query)
+        candidates = min(len(scores), k * max(rerank, 1))
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if rerank and self.vectors is not None:
+            # Sorted row order keeps memmap reads sequential
+            top = np.sort(top)
+            scores_top = np.asarray(self.vectors[top]) @ query
+        else:
+            scores_top = scores[top]
+        order = np.argsort(-scores_top)[:k]
+        return [(int(self.ids[top[i]]), float(scores_top[i])) for i in order]
+
+    def memory_bytes(self) -> dict:
+        return {
+            "codes": self.codes.nbytes,
+            "codebooks": self.pq.centroids.nbytes,
+            "ids": self.ids.nbytes,
+            "full_precision": len(self.ids) * self.pq.dimension * 4,
+        }
+
+    def save(self, directory: str):
+        """Codes, ids and codebooks in index.npz; full vectors in vectors.npy for memory-mapped re-ranking"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        np.savez(path / "index.npz", ids=self.ids, codes=self.codes.T, centroids=self.pq.centroids)
+        (path / "meta.json").write_text(json.dumps({"dimension": self.pq.dimension, "m": self.pq.m}))
+        if self.vectors is not None:
+            np.save(path / "vectors.npy", np.asarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, directory: str, mmap_vectors: bool = True):
+        path = Path(directory)
+        meta = json.loads((path / "meta.json").read_text())
+        data = np.load(path / "index.npz")
+        pq = ProductQuantizer(meta["dimension"], meta["m"])
+        pq.centroids = data["centroids"]
+        vectors_path = path / "vectors.npy"
+        vectors = np.load(vectors_path, mmap_mode="r" if mmap_vectors else None) if vectors_path.exists() else None
+        return cls(pq, data["ids"], data["codes"], vectors)
+
+def brute_force(vectors: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int) -> list:
+    k = min(k, len(ids))
+    if k <= 0:
+        return []
+    scores = np.asarray(vectors) @ np.asarray(query, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return [int(ids[i]) for i in top[np.argsort(-scores[top])]]
@@ -0,0 +1,81 @@
+"""
+Vector store clients used by the outbox drainer.
+
+Both clients take vectors as (id, values, metadata) tuples and upsert by id, so
+sending the same vector twice is harmless. VECTOR_STORE picks the client:
+"pinecone" for the real index, "local" for a file-backed stand-in that keeps
+one JSON file per namespace under VECTOR_STORE_PATH (tests, local runs).
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from app.core.config import settings
+
+class PineconeVectorStore:
+    def __init__(self, api_key: str, index_name: str, environment: str = None):
+        try:
+            from pinecone import Pinecone
+            self.index = Pinecone(api_key=api_key).Index(index_name)
+        except ImportError:
+            # pinecone-client 2.x
+            import pinecone
+            pinecone.init(api_key=api_key, environment=environment)
+            self.index = pinecone.Index(index_name)
+
+    def upsert(self, namespace: str, vectors: list):
+        self.index.upsert(vectors=[(id, list(values), metadata) for id, values, metadata in vectors], namespace=namespace)
+
+    def delete(self, namespace: str, ids: list):
+        self.index.delete(ids=list(ids), namespace=namespace)
+
+class LocalVectorStore:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def _file(self, namespace: str) -> Path:
+        return self.path / (namespace.replace("/", "__") + ".json")
+
+    def load(self, namespace: str) -> dict:
+        """{id: {"values", "metadata"}} for every vector in `namespace`"""
+        file = self._file(namespace)
+        return json.loads(file.read_text()) if file.exists() else {}
+
+    def _save(self, namespace: str, vectors: dict):
+        file = self._file(namespace)
+        tmp = file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(vectors))
+        os.replace(tmp, file)
+
+    def upsert(self, namespace: str, vectors: list):
+        with self.lock:
+            stored = self.load(namespace)
+            for id, values, metadata in vectors:
+                stored[id] = {"values": [float(v) for v in values], "metadata": metadata}
+            self._save(namespace, stored)
+
+    def delete(self, namespace: str, ids: list):
+        with self.lock:
+            stored = self.load(namespace)
+            for id in ids:
+                stored.pop(id, None)
+            self._save(namespace, stored)
+
+_store = None
+
+def get_vector_store():
+    global _store
+    if _store is None:
+        if settings.VECTOR_STORE == "local":
+            _store = LocalVectorStore(settings.VECTOR_STORE_PATH)
+        elif settings.VECTOR_STORE == "pinecone":
+            _store = PineconeVectorStore(
+                settings.PINECONE_API_KEY,
+                settings.PINECONE_INDEX_NAME,
+                settings.PINECONE_ENVIRONMENT
+            )
+        else:
+            raise ValueError(f"Unknown VECTOR_STORE '{settings.VECTOR_STORE}'")
+    return _store
@@ -0,0 +1,144 @@
+"""
+Drainer for vector_outbox.
+
+Each drain claims up to VECTOR_OUTBOX_BATCH_SIZE due outbox rows with
+FOR UPDATE SKIP LOCKED (so several drainers can run side by side) and, in the
+same short transaction, leases them by pushing available_at out by
+VECTOR_OUTBOX_LEASE_SECONDS. It then commits before any network call is made,
+so no row locks or pooled connection are held while the vector store is slow.
+A drainer that dies mid-batch just lets its lease run out.
+
+The current vector for each claimed job is sent in upserts of
+VECTOR_UPSERT_BATCH_SIZE, into the model's namespace. Rows for the same job and
+model are coalesced into one vector. Vector ids are derived from the job id, so
+a retried or repeated upsert overwrites instead of duplicating.
+
+A second transaction then acks the batch: sent rows are deleted and
+processed_jobs.pinecone_id is set to the id the vector now lives under
+(overwriting any id from before the outbox); rows whose upsert failed get
+attempts + 1 and are pushed back by VECTOR_OUTBOX_RETRY_SECONDS, doubling per
+attempt. Rows that reach VECTOR_OUTBOX_MAX_ATTEMPTS are left in place for
+inspection and no longer claimed.
+"""
+import numpy as np
+from app.core.config import settings
+from app.core.metrics import VECTOR_UPSERT_DURATION, timed
+from app.db.connection import get_db_connection
+
+CLAIM_OUTBOX = """
+WITH claimed AS (
+    SELECT id, processed_job_id, model
+    FROM vector_outbox
+    WHERE available_at <= LOCALTIMESTAMP AND attempts < %s
+    ORDER BY id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE vector_outbox o SET available_at = LOCALTIMESTAMP + make_interval(secs => %s)
+FROM claimed c
+JOIN processed_jobs p ON p.id = c.processed_job_id
+LEFT JOIN job_embeddings e ON e.processed_job_id = c.processed_job_id AND e.model = c.model
+WHERE o.id = c.id
+RETURNING o.id, o.processed_job_id, o.model, e.embedding, p.title, p.company, p.location, p.url
+"""
+
+def vector_id(job_id: int) -> str:
+    return f"job-{job_id}"
+
+def _claim(limit: int) -> list:
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(CLAIM_OUTBOX, (settings.VECTOR_OUTBOX_MAX_ATTEMPTS, limit, settings.VECTOR_OUTBOX_LEASE_SECONDS))
+                rows = cur.fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return rows
+
+def _ack(sent: list, synced_jobs: list, failures: list):
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                if sent:
+                    cur.execute("DELETE FROM vector_outbox WHERE id = ANY(%s)", (sent,))
+                if synced_jobs:
+                    # Same format as vector_id()
+                    cur.execute(
+                        "UPDATE processed_jobs SET pinecone_id = 'job-' || id WHERE id = ANY(%s) AND pinecone_id IS DISTINCT FROM 'job-' || id",
+                        (synced_jobs,)
+                    )
+                for outbox_ids, error in failures:
+                    cur.execute(
+                        """
+                        UPDATE vector_outbox SET
+                            attempts = attempts + 1,
+                            last_error = %s,
+                            available_at = LOCALTIMESTAMP + make_interval(secs => %s * power(2, attempts))
+                        WHERE id = ANY(%s)
+                        """,
+                        (error, settings.VECTOR_OUTBOX_RETRY_SECONDS, outbox_ids)
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def drain_outbox(store, limit: int = None) -> dict:
+    """Sync one batch of outbox rows to `store`; returns counts of sent and failed rows"""
+    rows = _claim(limit or settings.VECTOR_OUTBOX_BATCH_SIZE)
+
+    # (model, job id) -> [outbox ids, vector]; the latest committed vector wins
+    pending = {}
+    for outbox_id, job_id, model, embedding, title, company, location, url in rows:
+        entry = pending.setdefault((model, job_id), [[], None])
+        entry[0].append(outbox_id)
+        if embedding is not None:
+            metadata = {"title": title, "company": company, "location": location, "url": url}
+            entry[1] = (
+                vector_id(job_id),
+                np.frombuffer(embedding, dtype="<f4").tolist(),
+                {k: v for k, v in metadata.items() if v is not None}
+            )
+
+    sent, synced_jobs, failures = [], [], []
+    by_model = {}
+    for (model, job_id), (outbox_ids, vector) in pending.items():
+        if vector is None:
+            # The vector is gone (job re-embedded under another model or deleted); nothing to send
+            sent.extend(outbox_ids)
+            continue
+        by_model.setdefault(model, []).append((job_id, outbox_ids, vector))
+
+    batch_size = settings.VECTOR_UPSERT_BATCH_SIZE
+    for model, items in by_model.items():
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            outbox_ids = [outbox_id for _, ids, _ in batch for outbox_id in ids]
+            try:
+                with timed(VECTOR_UPSERT_DURATION):
+                    store.upsert(model, [vector for _, _, vector in batch])
+            except Exception as e:
+                failures.append((outbox_ids, str(e)[:1000]))
+                continue
+            sent.extend(outbox_ids)
+            synced_jobs.extend(job_id for job_id, _, _ in batch)
+
+    _ack(sent, synced_jobs, failures)
+    return {
+        "claimed": len(rows),
+        "sent": len(sent),
+        "failed": sum(len(outbox_ids) for outbox_ids, _ in failures),
+    }
+
+def outbox_backlog() -> dict:
+    """Rows waiting to be sent, and rows that exhausted their attempts"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT count(*) FILTER (WHERE attempts < %s), count(*) FILTER (WHERE attempts >= %s) FROM vector_outbox",
+                (settings.VECTOR_OUTBOX_MAX_ATTEMPTS, settings.VECTOR_OUTBOX_MAX_ATTEMPTS)
+            )
+            pending, dead = cur.fetchone()
+    return {"pending": pending, "dead": dead}
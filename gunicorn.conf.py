@@ -0,0 +1,48 @@
+# Preload-then-fork serving mode:
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# The master imports main.py once, which loads the default embedding model, and
+# then forks the workers. Tensor storage is never written after loading, so the
+# workers keep sharing those pages copy-on-write; gc.freeze() stops the garbage
+# collector from touching the model's Python objects and un-sharing their pages.
+# N workers therefore cost roughly one copy of the weights plus per-worker state.
+# Check with: python scripts/worker_memory.py <master pid>
+import gc
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Split the cores between workers so torch intra-op pools do not oversubscribe the CPU
+torch_threads = int(os.getenv("TORCH_THREADS_PER_WORKER", "0")) or max(1, (os.cpu_count() or 1) // workers)
+
+prometheus_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+def on_starting(server):
+    if prometheus_dir:
+        shutil.rmtree(prometheus_dir, ignore_errors=True)
+        os.makedirs(prometheus_dir, exist_ok=True)
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before any worker is forked.
+    # Do not run inference here: an initialised OpenMP pool does not survive fork.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app and froze %d objects for copy-on-write sharing", gc.get_freeze_count())
+
+def post_fork(server, worker):
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    server.log.info("Worker %s using %d torch threads", worker.pid, torch_threads)
+
+def child_exit(server, worker):
+    if prometheus_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -10,14 +10,25 @@ script_dir = Path(__file__).resolve().parent
 # This ensures Python looks here first for the 'app' directory
 sys.path.insert(0, str(script_dir))
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import hello
 from app.api import encode
 from app.api import task  # Add this import
+from app.api import chat
+from app.api import jobs
+from app.api import resumes
+from app.api import metrics
+from app.api import admin
 from app.core.config import settings
-from app.db.connection import init_connection_pool, close_all_db_connections
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.metrics import MetricsMiddleware, monitor_event_loop
+from app.core.profiling import SlowRequestProfiler
+from app.db.connection import ReadYourWritesMiddleware, init_connection_pool, close_all_db_connections
+from app.services.task_writer import task_writer
+from app.services.resume_parser import requeue_unparsed_resumes, requeue_unparsed_resumes_periodically, shutdown_parser
 
 
 
@@ -25,12 +36,36 @@ from app.db.connection import init_connection_pool, close_all_db_connections
 async def lifespan(app: FastAPI):
 		# Startup
 		init_connection_pool()
+		loop_monitor = asyncio.create_task(monitor_event_loop()) if settings.METRICS_ENABLED else None
+		# Resumes left pending by a restart; a parse that lands twice is a no-op
+		await requeue_unparsed_resumes()
+		# ... and parses a restart or a crashed parser process left behind since
+		parse_requeue = asyncio.create_task(requeue_unparsed_resumes_periodically(settings.RESUME_PARSE_LEASE_SECONDS))
 		yield
 		# Shutdown
+		if loop_monitor:
+				loop_monitor.cancel()
+		parse_requeue.cancel()
+		shutdown_parser()
+		task_writer.close()
 		close_all_db_connections()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
+# Slow-request profiling (innermost, so only time spent inside the app counts)
+if settings.PROFILING_ENABLED:
+		app.add_middleware(SlowRequestProfiler)
+
+# Per-request scope that keeps reads on the primary after a write
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Rate limiting and admission control (added before CORS so rejections still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
+# Request latency metrics (wraps the rate limiter so shed requests are measured too)
+if settings.METRICS_ENABLED:
+		app.add_middleware(MetricsMiddleware)
+
 # CORS Configuration
 app.add_middleware(
 		CORSMiddleware,
@@ -42,9 +77,14 @@ app.add_middleware(
 
 # # Include routers
 app.include_router(hello.router, tags=["Hello"])
+app.include_router(metrics.router, tags=["Metrics"])
 # app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(encode.router, prefix="/api/encode", tags=["Encoding"])
 app.include_router(task.router, prefix="/api/task", tags=["Tasks"])  # Add this line
+app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(resumes.router, prefix="/api/resumes", tags=["Resumes"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 if __name__ == "__main__":
 		print("🟢️ 🟢️ 🟢️ --- Starting JEMS api-server --- 🟢️ 🟢️ 🟢️")
@@ -0,0 +1,203 @@
+"""
+Resumable re-embedding backfill for processed_jobs.
+
+Walks processed_jobs in id order (keyset chunks, so every read is an index
+range scan no matter how far in we are), encodes each chunk on a pool of
+worker processes, and writes the vectors into job_embeddings plus the new
+embedding_status in one transaction per chunk. Duplicate jobs are skipped.
+
+After every committed chunk the last id is written to a checkpoint file, so a
+crashed or interrupted run picks up where it stopped; at most the chunks that
+were in flight get encoded again, and the upsert makes that harmless.
+
+Only an error raised by the model while encoding a batch marks its jobs
+FAILED. Anything else (a worker killed by the OOM killer, a broken pool, a
+result that cannot be pickled) stops the run before the chunk is written or
+checkpointed, so rerunning retries those jobs instead of skipping them.
+
+To leave room for live traffic, workers run at a lower CPU priority with a
+fixed number of torch threads each, and --max-rows-per-second caps the rate.
+
+Examples:
+    python scripts/backfill_embeddings.py                          # jobs with no vector for EMBEDDING_MODEL
+    python scripts/backfill_embeddings.py --status PENDING FAILED  # retry stuck rows
+    python scripts/backfill_embeddings.py --model e5 --workers 4 --max-rows-per-second 200
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+import numpy as np
+from app.db.queries.job_queries import fetch_jobs_for_embedding, store_job_embeddings
+from app.services.encoding import encode_long_texts, job_text
+from app.services.model_registry import registry
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by init_worker
+_model = None
+_model_name = None
+_encode_batch_size = None
+
+def init_worker(model_name: str, torch_threads: int, niceness: int, encode_batch_size: int):
+    global _model, _model_name, _encode_batch_size
+    if niceness:
+        os.nice(niceness)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _model_name = model_name
+    _encode_batch_size = encode_batch_size
+    _model = registry.get(model_name)
+
+def encode_batch(ids: list, texts: list):
+    """
+    Runs in a worker: returns (ids, float32 matrix of their embeddings, None),
+    or (ids, None, error) when the model failed on this batch
+    """
+    try:
+        results = encode_long_texts(_model, texts, batch_size=_encode_batch_size, model_name=_model_name)
+    except Exception as e:
+        return ids, None, f"{type(e).__name__}: {e}"
+    return ids, np.asarray([r["embedding"] for r in results], dtype=np.float32), None
+
+def load_checkpoint(path: Path, scope: dict) -> dict:
+    """Resume from `path` if it was written by a run with the same model and selection"""
+    if path.exists():
+        checkpoint = json.loads(path.read_text())
+        if checkpoint.get("scope") == scope:
+            return checkpoint
+        logger.warning(f"Ignoring checkpoint {path}: it belongs to {checkpoint.get('scope')}")
+    return {"scope": scope, "last_id": 0, "embedded": 0, "failed": 0}
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(checkpoint))
+    os.replace(tmp, path)
+
+class Throttle:
+    """Sleep as needed to keep the average rate at or under `rate` rows per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.started = time.monotonic()
+        self.rows = 0
+
+    def wait(self, rows: int):
+        self.rows += rows
+        if self.rate:
+            delay = self.started + self.rows / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+def write_chunk(model: str, last_id: int, futures: list, checkpoint: dict, checkpoint_path: Path):
+    embeddings, failed = [], []
+    for ids, future in futures:
+        # Raises on pool or infrastructure failures, before anything is written
+        _, vectors, error = future.result()
+        if error:
+            logger.error(f"Encoding {len(ids)} jobs starting at id {ids[0]} failed: {error}")
+            failed.extend(ids)
+        else:
+            embeddings.extend(zip(ids, vectors))
+    store_job_embeddings(model, embeddings, failed)
+    checkpoint["last_id"] = last_id
+    checkpoint["embedded"] += len(embeddings)
+    checkpoint["failed"] += len(failed)
+    save_checkpoint(checkpoint_path, checkpoint)
+
+def backfill(args):
+    model = registry.resolve(args.model)
+    scope = {"model": model, "status": sorted(args.status or [])}
+    checkpoint_path = Path(args.checkpoint or f"backfill_{model.replace('/', '_')}.json")
+    checkpoint = {"scope": scope, "last_id": 0, "embedded": 0, "failed": 0} if args.restart else load_checkpoint(checkpoint_path, scope)
+    after_id = checkpoint["last_id"]
+    logger.info(f"Backfilling {model} from id {after_id} with {args.workers} workers")
+
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // args.workers)
+    throttle = Throttle(args.max_rows_per_second)
+    in_flight = deque()  # (last id of chunk, [(ids, future)]), oldest first
+    started, seen = time.monotonic(), 0
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        # spawn, not fork: children must not inherit the parent's pool connections or torch state
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(model, torch_threads, args.niceness, args.encode_batch_size)
+    ) as pool:
+        exhausted = False
+        while not exhausted or in_flight:
+            if not exhausted and len(in_flight) <= args.prefetch:
+                rows = fetch_jobs_for_embedding(after_id, args.chunk_size, model, args.status)
+                if not rows:
+                    exhausted = True
+                else:
+                    futures = []
+                    for start in range(0, len(rows), args.batch_size):
+                        batch = rows[start:start + args.batch_size]
+                        futures.append((
+                            [row["id"] for row in batch],
+                            pool.submit(encode_batch, [row["id"] for row in batch], [job_text(row) for row in batch])
+                        ))
+                    after_id = rows[-1]["id"]
+                    in_flight.append((after_id, futures))
+                    seen += len(rows)
+                    if args.limit and seen >= args.limit:
+                        exhausted = True
+                    throttle.wait(len(rows))
+                    continue
+
+            if not in_flight:
+                break
+            # Chunks are committed strictly in order so the checkpoint never skips one
+            last_id, futures = in_flight.popleft()
+            try:
+                write_chunk(model, last_id, futures, checkpoint, checkpoint_path)
+            except Exception:
+                logger.error(f"Stopping without writing the chunk up to id {last_id}; rerun to resume from id {checkpoint['last_id']}")
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Up to id {last_id}: {checkpoint['embedded']} embedded, {checkpoint['failed']} failed "
+                f"({seen / max(elapsed, 1e-9):.1f} rows/s this run)"
+            )
+
+    logger.info(f"Done: {checkpoint['embedded']} embedded, {checkpoint['failed']} failed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed processed_jobs into job_embeddings")
+    parser.add_argument("--model", help="Model name from EMBEDDING_MODEL/EMBEDDING_MODELS (default: EMBEDDING_MODEL)")
+    parser.add_argument("--status", nargs="+", choices=["PENDING", "FAILED", "SUCCESS"],
+                        help="Select jobs by embedding_status instead of jobs missing a vector for --model")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--torch-threads", type=int, default=0, help="Threads per worker (default: cores / workers)")
+    parser.add_argument("--niceness", type=int, default=10, help="CPU priority increment for workers")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows read and committed together")
+    parser.add_argument("--batch-size", type=int, default=250, help="Rows per worker task")
+    parser.add_argument("--encode-batch-size", type=int, default=64, help="Windows per model.encode call")
+    parser.add_argument("--prefetch", type=int, default=2, help="Chunks encoded ahead of the one being written")
+    parser.add_argument("--max-rows-per-second", type=float, default=0, help="0 = unthrottled")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after roughly this many rows")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: backfill_<model>.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    backfill(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
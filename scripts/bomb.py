@@ -0,0 +1,414 @@
+"""
+Load and benchmark suite for the API hot paths.
+
+Runs the FastAPI app in-process over an ASGI transport and drives:
+  - POST /api/encode/text at several concurrency levels and text lengths
+  - POST /api/encode/texts in long-text mode with batches of long documents
+  - POST /api/task/create, publishing to Celery's in-memory broker; its
+    buffered celery_tasks writes are flushed to the local Postgres and timed
+    when one is given, and discarded otherwise
+  - the auth login and verify flows against a local Postgres (optional)
+
+Reports throughput, p50/p95/p99 latency and peak RSS as JSON, and compares
+against a stored baseline. Nothing leaves the machine: Redis-backed rate
+limiting is switched off, Celery uses the memory:// transport and Hugging Face
+is forced offline (pass --fake-encoder if the model is not in the local cache).
+
+Examples:
+    python scripts/bomb.py --fake-encoder --output bench.json
+    python scripts/bomb.py --save-baseline scripts/bomb_baseline.json
+    python scripts/bomb.py --baseline scripts/bomb_baseline.json --fail-on-regression
+    python scripts/bomb.py --database-url postgresql://localhost/jems_bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+import logging
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+VOCABULARY = (
+    "python backend engineer senior remote api distributed systems postgres redis "
+    "kubernetes cloud aws docker machine learning data pipeline microservices team "
+    "experience years design scalable services customers product agile testing"
+).split()
+
+BENCH_AUTH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_blacklist (
+    token TEXT PRIMARY KEY,
+    blacklisted_on TIMESTAMP NOT NULL
+);
+"""
+
+BENCH_TASK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS celery_tasks (
+    id SERIAL PRIMARY KEY,
+    task_id VARCHAR(255) UNIQUE NOT NULL,
+    status VARCHAR(50) NOT NULL DEFAULT 'PENDING',
+    task_name VARCHAR(255) NOT NULL,
+    task_args JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    error_message TEXT,
+    retries INTEGER DEFAULT 0,
+    last_retry_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS task_logs (
+    id SERIAL PRIMARY KEY,
+    task_pk_id INTEGER REFERENCES celery_tasks(id) ON DELETE CASCADE,
+    task_uuid VARCHAR(255),
+    log_level VARCHAR(20) NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+def configure_environment(args):
+    """Point every external dependency at a local stand-in before the app is imported"""
+    for name, value in {
+        "UPSTASH_REDIS_HOST": "localhost",
+        "UPSTASH_REDIS_PASSWORD": "bench",
+        "PINECONE_API_KEY": "bench",
+        "PINECONE_INDEX_NAME": "bench",
+        "PINECONE_ENVIRONMENT": "bench",
+        "SECRET_KEY": "bench-secret",
+    }.items():
+        os.environ.setdefault(name, value)
+    os.environ["DATABASE_URL"] = args.database_url or "postgresql://localhost/jems_bench"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # The encoder admission gate is independent of RATE_LIMIT_ENABLED; by default
+    # queue every request so scenarios measure latency, not load shedding
+    os.environ.setdefault("ENCODE_MAX_QUEUE", "1000")
+    os.environ.setdefault("ENCODE_QUEUE_TIMEOUT_SECONDS", "60")
+    os.environ["METRICS_ENABLED"] = "false"
+    os.environ["PROFILING_ENABLED"] = "false"
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+def install_fake_encoder(dimension: int = 384):
+    """Replace sentence_transformers with a deterministic stand-in whose cost grows with input length"""
+    import numpy as np
+
+    class FakeTokenizer:
+        """Whitespace tokenizer with a growing vocabulary"""
+
+        def __init__(self):
+            self.ids, self.words = {}, []
+
+        def encode(self, text, add_special_tokens=True):
+            ids = []
+            for word in text.split():
+                if word not in self.ids:
+                    self.ids[word] = len(self.words)
+                    self.words.append(word)
+                ids.append(self.ids[word])
+            return ids
+
+        def decode(self, ids):
+            return " ".join(self.words[i] for i in ids)
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name_or_path=None, **kwargs):
+            self.dimension = dimension
+            self.tokenizer = FakeTokenizer()
+
+        def get_sentence_embedding_dimension(self):
+            return self.dimension
+
+        def get_max_seq_length(self):
+            return 256
+
+        def _vector(self, text):
+            vector = np.zeros(self.dimension, dtype=np.float32)
+            for token in text.split():
+                vector[hash(token) % self.dimension] += 1.0
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else vector
+
+        def encode(self, sentences, **kwargs):
+            if isinstance(sentences, str):
+                return self._vector(sentences)
+            return np.stack([self._vector(text) for text in sentences])
+
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeSentenceTransformer
+    sys.modules["sentence_transformers"] = module
+
+    # The stand-in has no torch forward pass; its whole-word ids round-trip
+    # through decode(), so embed long-text windows through encode() instead
+    from app.services import encoding
+
+    def encode_token_windows(model, windows, prefix, suffix):
+        return model.encode([model.tokenizer.decode(ids) for ids in windows])
+
+    encoding.encode_token_windows = encode_token_windows
+
+def use_memory_broker():
+    from app.services.celery_blueprint import celery_app
+    celery_app.conf.update(
+        broker_url="memory://",
+        result_backend="cache+memory://",
+        broker_use_ssl=False,
+        redis_backend_use_ssl=False,
+    )
+
+def make_text(words: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def summarize(latencies: list, elapsed: float, errors: int) -> dict:
+    ordered = sorted(latencies)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0] if ordered else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+async def run_load(call, concurrency: int, total: int) -> dict:
+    """Run `call(i)` `total` times across `concurrency` workers; call returns True on success"""
+    latencies, errors = [], 0
+    pending = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            ok = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+async def bench_encode(client, args, results):
+    for words in args.text_words:
+        texts = [make_text(words, seed) for seed in range(64)]
+        await client.post("/api/encode/text", json={"text": texts[0]})  # warm up
+
+        for concurrency in args.concurrency:
+            async def call(i):
+                response = await client.post("/api/encode/text", json={"text": texts[i % len(texts)]})
+                return response.status_code == 200
+            key = f"encode_text/words={words}/c={concurrency}"
+            results[key] = await run_load(call, concurrency, args.requests)
+            logger.info(f"  {key}: {results[key]['throughput_rps']} rps, p95 {results[key]['p95_ms']} ms")
+
+async def bench_encode_long(client, args, results):
+    texts = [make_text(args.long_text_words, seed) for seed in range(8)]
+    for concurrency in args.concurrency:
+        async def call(i):
+            response = await client.post(
+                "/api/encode/texts",
+                json={"texts": texts, "long_text": True, "pooling": "weighted"}
+            )
+            return response.status_code == 200
+        key = f"encode_texts_long/words={args.long_text_words}x{len(texts)}/c={concurrency}"
+        results[key] = await run_load(call, concurrency, max(1, args.requests // 10))
+        logger.info(f"  {key}: {results[key]['throughput_rps']} rps, p95 {results[key]['p95_ms']} ms")
+
+async def bench_task_create(client, args, results):
+    from app.services.task_writer import task_writer
+
+    if args.database_url:
+        from app.db.connection import get_db_connection
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(BENCH_TASK_SCHEMA)
+            conn.commit()
+    else:
+        # No database to flush to: drop the buffered writes instead of letting
+        # the flusher retry against one that is not there
+        task_writer._write = lambda statuses, logs: None
+
+    payload = {
+        "job_title": "Software Engineer",
+        "location": "Remote",
+        "country": "us",
+        "num_jobs": 25,
+        "site_names": ["linkedin", "indeed"],
+    }
+
+    async def call(i):
+        response = await client.post("/api/task/create", json=payload)
+        return response.status_code == 200
+
+    for concurrency in args.concurrency:
+        key = f"task_create/c={concurrency}"
+        results[key] = await run_load(call, concurrency, args.requests)
+        # The requests only buffer their celery_tasks rows; time the write they deferred
+        start = time.perf_counter()
+        await asyncio.to_thread(task_writer.flush)
+        if args.database_url:
+            results[key]["flush_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        logger.info(f"  {key}: {results[key]['throughput_rps']} rps, p95 {results[key]['p95_ms']} ms")
+
+async def bench_auth(args, results):
+    # The auth router is not mounted in main.py, so drive the service layer it wraps
+    from app.db.connection import get_db_connection
+    from app.core.security import get_password_hash
+    from app.schemas.auth import UserLogin
+    from app.services.auth import authenticate_user, verify_token
+
+    username, password = "bench_user", "bench-password"
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(BENCH_AUTH_SCHEMA)
+            cur.execute(
+                """
+                INSERT INTO users (username, password, email, name)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (username) DO UPDATE SET password = EXCLUDED.password
+                """,
+                (username, get_password_hash(password), "bench@example.com", "Bench User")
+            )
+            conn.commit()
+
+    credentials = UserLogin(username=username, password=password)
+    token = (await authenticate_user(credentials))["access_token"]
+
+    async def login(i):
+        return bool((await authenticate_user(credentials))["access_token"])
+
+    async def verify(i):
+        return bool((await verify_token(token))["id"])
+
+    for name, call in (("auth_login", login), ("auth_verify", verify)):
+        for concurrency in args.concurrency:
+            key = f"{name}/c={concurrency}"
+            results[key] = await run_load(call, concurrency, args.requests)
+            logger.info(f"  {key}: {results[key]['throughput_rps']} rps, p95 {results[key]['p95_ms']} ms")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return one row per scenario present in both runs, flagging regressions beyond `tolerance`"""
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous or not previous["throughput_rps"] or not previous["p95_ms"]:
+            continue
+        throughput_change = current["throughput_rps"] / previous["throughput_rps"] - 1
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1
+        rows.append({
+            "scenario": key,
+            "throughput_change": round(throughput_change, 4),
+            "p95_change": round(p95_change, 4),
+            "regression": throughput_change < -tolerance or p95_change > tolerance,
+        })
+    return rows
+
+async def run(args) -> dict:
+    import httpx
+    from main import app
+
+    results, skipped = {}, []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        logger.info("Benchmarking /api/encode/text")
+        await bench_encode(client, args, results)
+        logger.info("Benchmarking /api/encode/texts (long-text mode)")
+        await bench_encode_long(client, args, results)
+        logger.info("Benchmarking /api/task/create")
+        await bench_task_create(client, args, results)
+    if args.database_url:
+        logger.info("Benchmarking auth login/verify")
+        await bench_auth(args, results)
+    else:
+        skipped.append("task_create write-behind flush (pass --database-url to a local Postgres)")
+        skipped.append("auth (pass --database-url to a local Postgres)")
+    return {"results": results, "skipped": skipped}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the JEMS API hot paths in-process")
+    parser.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--text-words", type=lambda s: [int(x) for x in s.split(",")], default=[16, 128, 512])
+    parser.add_argument("--long-text-words", type=int, default=2000, help="words per long-text document")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--database-url", help="local Postgres for the auth scenarios")
+    parser.add_argument("--fake-encoder", action="store_true", help="use a deterministic stand-in model")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="also write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    if args.fake_encoder:
+        install_fake_encoder()
+    use_memory_broker()
+
+    report = asyncio.run(run(args))
+    report["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fake_encoder": args.fake_encoder,
+        "requests_per_scenario": args.requests,
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    regressions = []
+    if args.baseline and Path(args.baseline).exists():
+        report["comparison"] = compare(report["results"], json.loads(Path(args.baseline).read_text()), args.tolerance)
+        regressions = [row for row in report["comparison"] if row["regression"]]
+        for row in report["comparison"]:
+            marker = "❌" if row["regression"] else "✅"
+            logger.info(
+                f"{marker} {row['scenario']}: throughput {row['throughput_change']:+.1%}, p95 {row['p95_change']:+.1%}"
+            )
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+    else:
+        print(payload)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(payload)
+        logger.info(f"Saved baseline to {args.save_baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Send queued vectors from vector_outbox to the vector store.
+
+Drains until nothing is due, then exits; with --follow keeps polling. Safe to
+run several copies at once: each claims its own rows.
+
+Examples:
+    python scripts/drain_vector_outbox.py
+    python scripts/drain_vector_outbox.py --follow --interval 5
+    VECTOR_STORE=local VECTOR_STORE_PATH=/tmp/vectors python scripts/drain_vector_outbox.py
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+from app.services.vector_store import get_vector_store
+from app.services.vector_sync import drain_outbox, outbox_backlog
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain vector_outbox into the vector store")
+    parser.add_argument("--batch-size", type=int, default=None, help="Outbox rows per drain (default: VECTOR_OUTBOX_BATCH_SIZE)")
+    parser.add_argument("--follow", action="store_true", help="Keep polling once the outbox is empty")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --follow")
+    args = parser.parse_args()
+
+    store = get_vector_store()
+    totals = {"sent": 0, "failed": 0}
+    while True:
+        result = drain_outbox(store, args.batch_size)
+        totals["sent"] += result["sent"]
+        totals["failed"] += result["failed"]
+        if result["claimed"]:
+            logger.info(f"Sent {result['sent']}, failed {result['failed']} of {result['claimed']} outbox rows")
+            # A batch where everything failed means the store is down; back off instead of spinning
+            if result["sent"]:
+                continue
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+
+    backlog = outbox_backlog()
+    logger.info(f"Done: {totals['sent']} sent, {totals['failed']} failed; "
+                f"{backlog['pending']} still queued, {backlog['dead']} out of attempts")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
 from app.services.celery_blueprint import process_task
+from app.core.metrics import CELERY_PUBLISH_DURATION, timed
+from app.services.task_writer import task_writer
 
 def enqueue_task(job_title: str, location: str, country: str, num_jobs: int, site_names: list):
     """Enqueue a job scraping task"""
@@ -27,7 +29,9 @@ def enqueue_task(job_title: str, location: str, country: str, num_jobs: int, sit
     }
     
     # Send task to Celery
-    result = process_task.delay(task_data)
+    with timed(CELERY_PUBLISH_DURATION, task=process_task.task):
+        result = process_task.delay(task_data)
+    task_writer.task_status(result.id, "PENDING", task_name=process_task.task, task_args=task_data)
     return result.id
 
 if __name__ == "__main__":
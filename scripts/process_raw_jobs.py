@@ -0,0 +1,117 @@
+"""
+Move scraped raw_jobs into processed_jobs, collapsing near-duplicates.
+
+The scrape worker (tasks.process_job_task, outside this repo) must call
+process_raw_jobs() for each task once its raw_jobs are written; until it does,
+dedup is not on the ingest path. This script runs the same step from the
+command line, e.g. for tasks whose raw rows were never processed. --check runs an end-to-end dedup check
+against the database on a throwaway task and removes it afterwards.
+
+Examples:
+    python scripts/process_raw_jobs.py <task_id> [<task_id> ...]
+    python scripts/process_raw_jobs.py --check
+"""
+import argparse
+import logging
+import random
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+from app.db.connection import get_db_connection
+from app.db.queries.job_queries import process_raw_jobs
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+def insert_raw_jobs(task_id: str, jobs: list):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            for job in jobs:
+                cur.execute(
+                    """
+                    INSERT INTO raw_jobs (task_id, raw_data, title, company, location, job_url, description)
+                    VALUES (%s, '{}', %s, %s, %s, %s, %s)
+                    """,
+                    (task_id, job["title"], job["company"], job["location"], job["url"], job["description"])
+                )
+        conn.commit()
+
+def check() -> bool:
+    """
+    A reposted job (same posting, a couple of words changed) must be collapsed
+    onto the original, both within one batch and against rows already stored,
+    while an unrelated job from the same company stays canonical.
+    """
+    rng = random.Random()
+    vocabulary = [f"w{rng.randrange(10**9)}" for _ in range(400)]
+    description = " ".join(rng.choice(vocabulary) for _ in range(150))
+    reworded = description.split()
+    for i in (20, 90):
+        reworded[i] = "changed"
+    original = {"title": "Backend Engineer", "company": "Dedup Check Ltd", "location": "Remote",
+                "url": "https://example.com/1", "description": description}
+    repost = {**original, "url": "https://example.com/2", "description": " ".join(reworded)}
+    unrelated = {**original, "title": "Data Analyst", "url": "https://example.com/3",
+                 "description": " ".join(rng.choice(vocabulary) for _ in range(150))}
+
+    task_id = f"dedup-check-{uuid4()}"
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO celery_tasks (task_id, task_name) VALUES (%s, 'dedup_check')", (task_id,))
+        conn.commit()
+    try:
+        insert_raw_jobs(task_id, [original, repost, unrelated])
+        first = process_raw_jobs(task_id)
+        insert_raw_jobs(task_id, [{**repost, "url": "https://example.com/4"}])
+        second = process_raw_jobs(task_id)
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT url, canonical_job_id, embedding_status, id FROM processed_jobs WHERE task_id = %s ORDER BY id",
+                    (task_id,)
+                )
+                rows = cur.fetchall()
+            conn.rollback()
+    finally:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM celery_tasks WHERE task_id = %s", (task_id,))
+            conn.commit()
+
+    by_url = {url: (canonical, status, job_id) for url, canonical, status, job_id in rows}
+    original_id = by_url["https://example.com/1"][2]
+    expected = {
+        "https://example.com/1": (None, "PENDING"),
+        "https://example.com/2": (original_id, "DUPLICATE"),  # in the same batch
+        "https://example.com/3": (None, "PENDING"),
+        "https://example.com/4": (original_id, "DUPLICATE"),  # against the stored index
+    }
+    ok = first == {"inserted": 3, "duplicates": 1} and second == {"inserted": 1, "duplicates": 1}
+    for url, (canonical, status) in expected.items():
+        actual = by_url.get(url, (None, None))[:2]
+        if actual != (canonical, status):
+            ok = False
+            logger.error(f"{url}: expected {(canonical, status)}, got {actual}")
+    logger.info(f"Dedup check {'passed' if ok else 'FAILED'}: first batch {first}, second batch {second}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Process raw_jobs into processed_jobs with near-duplicate detection")
+    parser.add_argument("task_ids", nargs="*", help="Tasks whose raw_jobs to process")
+    parser.add_argument("--check", action="store_true", help="Verify near-duplicates are collapsed, then exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+    if not args.task_ids:
+        parser.error("give at least one task id, or --check")
+    for task_id in args.task_ids:
+        logger.info(f"{task_id}: {process_raw_jobs(task_id)}")
+
+if __name__ == "__main__":
+    main()
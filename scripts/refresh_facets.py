@@ -0,0 +1,42 @@
+"""
+Refresh the job search facet views.
+
+Run from cron, or with --interval to keep refreshing in a loop. Refreshes are
+concurrent, so API reads are never blocked; overlapping runs skip themselves.
+
+Examples:
+    python scripts/refresh_facets.py
+    python scripts/refresh_facets.py --interval 300
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+from app.db.queries.facet_queries import refresh_job_facets
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh job facet materialized views")
+    parser.add_argument("--interval", type=float, default=0, help="Seconds between refreshes; 0 = refresh once")
+    args = parser.parse_args()
+
+    while True:
+        started = time.monotonic()
+        if refresh_job_facets():
+            logger.info(f"Refreshed job facets in {time.monotonic() - started:.2f}s")
+        else:
+            logger.info("Another refresh is running; skipped")
+        if not args.interval:
+            break
+        time.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Build and evaluate the product-quantized job vector index.
+
+build: trains the quantizer over job_embeddings for a model and saves the
+       index (codes + codebooks, plus full vectors for memory-mapped re-ranking).
+eval:  reports memory, query latency and recall@k against exact brute-force
+       search, with and without re-ranking. Queries are stored vectors with a
+       little noise added, so they are near but not identical to a stored job.
+
+Examples:
+    python scripts/vector_index.py build --output vector_index/
+    python scripts/vector_index.py eval --index vector_index/ --queries 200 --k 10
+    python scripts/vector_index.py eval --synthetic 200000   # no database needed
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+import numpy as np
+from app.services.vector_index import CompressedVectorIndex, brute_force
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+def load_vectors(model: str = None):
+    from app.core.config import settings
+    from app.db.queries.job_queries import load_job_embeddings
+    model = model or settings.EMBEDDING_MODEL
+    started = time.perf_counter()
+    ids, vectors = load_job_embeddings(model)
+    logger.info(f"Loaded {len(ids)} vectors for {model} in {time.perf_counter() - started:.1f}s")
+    if not len(ids):
+        raise SystemExit(f"No vectors in job_embeddings for {model}; run scripts/backfill_embeddings.py first")
+    return ids, vectors
+
+def synthetic_vectors(n: int, dimension: int = 384, latent: int = 64, clusters: int = 200, seed: int = 0):
+    """
+    Clustered unit vectors on a `latent`-dimensional subspace plus a little
+    isotropic noise; sentence embeddings have a similarly low intrinsic
+    dimension, unlike uniform noise, which no quantizer compresses well.
+    """
+    rng = np.random.RandomState(seed)
+    projection = rng.randn(latent, dimension).astype(np.float32)
+    centers = rng.randn(clusters, latent).astype(np.float32)
+    points = centers[rng.randint(clusters, size=n)] + 0.7 * rng.randn(n, latent).astype(np.float32)
+    vectors = points @ projection + 0.5 * rng.randn(n, dimension).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.arange(1, n + 1, dtype=np.int64), vectors
+
+def build(args):
+    ids, vectors = load_vectors(args.model)
+    started = time.perf_counter()
+    index = CompressedVectorIndex.build(ids, vectors, m=args.m, iterations=args.iterations, sample=args.train_sample)
+    logger.info(f"Trained and encoded {len(ids)} vectors in {time.perf_counter() - started:.1f}s")
+    index.save(args.output)
+    logger.info(f"Saved index to {args.output}: {json.dumps(index.memory_bytes())}")
+
+def evaluate(args):
+    if args.index:
+        index = CompressedVectorIndex.load(args.index)
+        ids, vectors = index.ids, index.vectors
+        if vectors is None:
+            raise SystemExit("The index has no full-precision vectors to compare against")
+    else:
+        ids, vectors = synthetic_vectors(args.synthetic) if args.synthetic else load_vectors(args.model)
+        started = time.perf_counter()
+        index = CompressedVectorIndex.build(ids, vectors, m=args.m, iterations=args.iterations, sample=args.train_sample)
+        logger.info(f"Trained and encoded {len(ids)} vectors in {time.perf_counter() - started:.1f}s")
+
+    rng = np.random.RandomState(1)
+    queries = np.asarray(vectors[rng.choice(len(ids), min(args.queries, len(ids)), replace=False)], dtype=np.float32)
+    queries += args.noise * rng.randn(*queries.shape).astype(np.float32) / np.sqrt(queries.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    k = min(args.k, len(ids))
+    truth, exact_seconds = [], 0.0
+    for query in queries:
+        started = time.perf_counter()
+        truth.append(set(brute_force(vectors, ids, query, k)))
+        exact_seconds += time.perf_counter() - started
+
+    results = {}
+    for rerank in (0, args.rerank):
+        hits, seconds = 0, 0.0
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = index.search(query, k=k, rerank=rerank)
+            seconds += time.perf_counter() - started
+            hits += len(expected & {job_id for job_id, _ in found})
+        results[f"rerank_{rerank}" if rerank else "adc_only"] = {
+            f"recall@{k}": round(hits / (len(queries) * k), 4),
+            "ms_per_query": round(1000 * seconds / len(queries), 3),
+        }
+
+    memory = index.memory_bytes()
+    compressed = memory["codes"] + memory["codebooks"] + memory["ids"]
+    report = {
+        "vectors": len(ids),
+        "dimension": index.pq.dimension,
+        "m": index.pq.m,
+        "memory_mb": {
+            "full_precision": round(memory["full_precision"] / 2**20, 2),
+            "compressed": round(compressed / 2**20, 2),
+            "ratio": round(memory["full_precision"] / compressed, 1),
+        },
+        "brute_force_ms_per_query": round(1000 * exact_seconds / len(queries), 3),
+        **results,
+    }
+    print(json.dumps(report, indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Product-quantized job vector index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_training_args(sub):
+        sub.add_argument("--model", help="Model in job_embeddings (default: EMBEDDING_MODEL)")
+        sub.add_argument("--m", type=int, default=48, help="Subspaces, i.e. bytes per vector")
+        sub.add_argument("--iterations", type=int, default=20, help="k-means iterations per subspace")
+        sub.add_argument("--train-sample", type=int, default=50000, help="Vectors used to train the codebooks")
+
+    build_parser = subparsers.add_parser("build", help="Train and save an index from job_embeddings")
+    add_training_args(build_parser)
+    build_parser.add_argument("--output", default="vector_index")
+
+    eval_parser = subparsers.add_parser("eval", help="Report memory and recall@k against brute force")
+    add_training_args(eval_parser)
+    eval_parser.add_argument("--index", help="Evaluate a saved index instead of training one")
+    eval_parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of the database")
+    eval_parser.add_argument("--queries", type=int, default=200)
+    eval_parser.add_argument("--k", type=int, default=10)
+    eval_parser.add_argument("--rerank", type=int, default=10, help="Candidates re-scored exactly, as a multiple of k")
+    eval_parser.add_argument("--noise", type=float, default=0.5, help="Query perturbation, relative to vector norm")
+
+    args = parser.parse_args()
+    build(args) if args.command == "build" else evaluate(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import sys
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.append(project_root)
+
+from app.core.memory import process_memory, child_pids
+
+def main():
+    """Print RSS/PSS for a gunicorn master and each of its workers"""
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/worker_memory.py <gunicorn master pid>")
+        sys.exit(1)
+
+    master = int(sys.argv[1])
+    workers = [process_memory(pid) for pid in child_pids(master)]
+    report = {
+        "master": process_memory(master),
+        "workers": workers,
+        # PSS already splits shared pages between sharers, so it sums to the true footprint
+        "total_pss_mb": round(process_memory(master).get("pss_mb", 0) + sum(w.get("pss_mb", 0) for w in workers), 1),
+        "total_rss_mb": round(process_memory(master).get("rss_mb", 0) + sum(w.get("rss_mb", 0) for w in workers), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -224,7 +224,8 @@ CREATE TABLE processed_jobs (
     salary_max DECIMAL(12,2),
     salary_currency VARCHAR(3),
     pinecone_id VARCHAR(255) UNIQUE,
-    embedding_status VARCHAR(50) DEFAULT 'PENDING' CHECK (embedding_status IN ('PENDING', 'PROCESSING', 'SUCCESS', 'FAILED')),
+    embedding_status VARCHAR(50) DEFAULT 'PENDING' CHECK (embedding_status IN ('PENDING', 'PROCESSING', 'SUCCESS', 'FAILED', 'DUPLICATE')),
+    canonical_job_id INTEGER REFERENCES processed_jobs(id) ON DELETE SET NULL, -- Set for near-duplicates; such rows are never embedded
     processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Use TIMESTAMP
 );
 
@@ -232,6 +233,50 @@ CREATE INDEX idx_processed_jobs_task_id ON processed_jobs(task_id); -- Keep FK i
 CREATE INDEX idx_processed_jobs_embedding_status ON processed_jobs(embedding_status); -- Keep status index
 CREATE INDEX idx_processed_jobs_pinecone_id ON processed_jobs(pinecone_id); -- Keep likely lookup index
 -- Removed idx_processed_jobs_created for minimalism
+CREATE INDEX idx_processed_jobs_canonical ON processed_jobs(canonical_job_id) WHERE canonical_job_id IS NOT NULL;
+CREATE INDEX idx_processed_jobs_raw_job_id ON processed_jobs(raw_job_id); -- process_raw_jobs skips raw rows already processed
+
+-- ========= JOB EMBEDDINGS =========
+
+CREATE TABLE job_embeddings (
+    processed_job_id INTEGER NOT NULL REFERENCES processed_jobs(id) ON DELETE CASCADE,
+    model TEXT NOT NULL, -- One row per model, so legacy vectors survive a model migration
+    dimension SMALLINT NOT NULL,
+    embedding BYTEA NOT NULL, -- little-endian float32 x dimension
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (processed_job_id, model)
+);
+
+-- ========= VECTOR STORE OUTBOX =========
+
+-- Written in the same transaction as job_embeddings; drained by scripts/drain_vector_outbox.py
+CREATE TABLE vector_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    processed_job_id INTEGER NOT NULL REFERENCES processed_jobs(id) ON DELETE CASCADE,
+    model TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Pushed back after each failed attempt
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_vector_outbox_available ON vector_outbox(available_at, id);
+
+-- ========= NEAR-DUPLICATE DETECTION (MinHash / LSH) =========
+
+CREATE TABLE job_minhash (
+    processed_job_id INTEGER PRIMARY KEY REFERENCES processed_jobs(id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL -- 128 little-endian uint32 MinHash values
+);
+
+CREATE TABLE job_lsh_buckets (
+    band SMALLINT NOT NULL,
+    bucket_hash BIGINT NOT NULL,
+    processed_job_id INTEGER NOT NULL REFERENCES job_minhash(processed_job_id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket_hash, processed_job_id) -- Candidate lookup is an index-only scan
+);
+
+CREATE INDEX idx_job_lsh_buckets_job ON job_lsh_buckets(processed_job_id); -- Keep FK index
 
 -- ========= RESUME TABLES (Minimal - No Trigger) =========
 
@@ -252,12 +297,16 @@ CREATE TABLE resumes (
     projects JSONB NOT NULL,
     technical_skills JSONB NOT NULL,
     certifications_achievements JSONB NOT NULL,
+    content_hash TEXT, -- sha256 of the uploaded file; makes upload retries idempotent
+    parse_error TEXT, -- Set when parsing failed; the resume stays pending until a retry succeeds
+    parse_claimed_at TIMESTAMP, -- Lease on a pending parse; startup requeues only re-claim expired leases
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Use TIMESTAMP
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP  -- Use TIMESTAMP, Application MUST update manually
 );
 
 CREATE INDEX idx_resumes_user_id ON resumes(user_id); -- Keep FK index
 CREATE INDEX idx_resumes_status ON resumes(status); -- Keep status index
+CREATE UNIQUE INDEX idx_resumes_user_content ON resumes(user_id, content_hash) WHERE content_hash IS NOT NULL;
 
 -- ========= CHAT TABLES (Minimal - No Trigger) =========
 
@@ -279,8 +328,8 @@ CREATE TABLE chat_messages (
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Use TIMESTAMP
 );
 
-CREATE INDEX idx_chat_messages_chat_id ON chat_messages(chat_id); -- Keep FK index
--- Removed idx_chat_messages_created_at for minimalism
+-- Composite index doubles as the FK index and backs keyset pagination over a chat's history
+CREATE INDEX idx_chat_messages_chat_created ON chat_messages(chat_id, created_at, id);
 
 -- ========= TASK PROCESSING LOGS (Minimal - No Trigger) =========
 
@@ -296,6 +345,75 @@ CREATE TABLE task_logs (
 CREATE INDEX idx_task_logs_task_pk ON task_logs(task_pk_id); -- Keep FK index
 -- Removed idx_task_logs_log_level, idx_task_logs_created_at, idx_task_logs_task_uuid for minimalism
 
+-- ========= JOB SEARCH FACETS =========
+-- Precomputed aggregates over canonical jobs (duplicates excluded), so facet reads
+-- never scan processed_jobs. Each view has a unique index so it can be refreshed
+-- with REFRESH MATERIALIZED VIEW CONCURRENTLY (see scripts/refresh_facets.py)
+-- without blocking readers.
+
+CREATE MATERIALIZED VIEW job_facet_locations AS
+SELECT COALESCE(NULLIF(TRIM(location), ''), 'Unknown') AS location, COUNT(*) AS job_count
+FROM processed_jobs
+WHERE canonical_job_id IS NULL
+GROUP BY 1;
+
+CREATE UNIQUE INDEX idx_job_facet_locations ON job_facet_locations(location);
+CREATE INDEX idx_job_facet_locations_count ON job_facet_locations(job_count DESC);
+
+CREATE MATERIALIZED VIEW job_facet_job_types AS
+SELECT COALESCE(NULLIF(LOWER(TRIM(job_type)), ''), 'unknown') AS job_type, COUNT(*) AS job_count
+FROM processed_jobs
+WHERE canonical_job_id IS NULL
+GROUP BY 1;
+
+CREATE UNIQUE INDEX idx_job_facet_job_types ON job_facet_job_types(job_type);
+CREATE INDEX idx_job_facet_job_types_count ON job_facet_job_types(job_count DESC);
+
+-- Midpoint of the posted range, annualised from raw_jobs.salary_interval, in
+-- 10k buckets per currency (no FX conversion); the top bucket is 500k and above
+CREATE MATERIALIZED VIEW job_facet_salaries AS
+SELECT
+    COALESCE(salary_currency, 'UNK') AS salary_currency,
+    LEAST(FLOOR(annual_salary / 10000) * 10000, 500000)::INTEGER AS bucket_min,
+    COUNT(*) AS job_count
+FROM (
+    SELECT
+        p.salary_currency,
+        (COALESCE(p.salary_min, p.salary_max) + COALESCE(p.salary_max, p.salary_min)) / 2
+            * CASE LOWER(r.salary_interval)
+                WHEN 'hourly' THEN 2080
+                WHEN 'daily' THEN 260
+                WHEN 'weekly' THEN 52
+                WHEN 'monthly' THEN 12
+                ELSE 1
+              END AS annual_salary
+    FROM processed_jobs p
+    LEFT JOIN raw_jobs r ON r.id = p.raw_job_id
+    WHERE p.canonical_job_id IS NULL
+      AND (p.salary_min IS NOT NULL OR p.salary_max IS NOT NULL)
+) annualised
+WHERE annual_salary >= 0
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX idx_job_facet_salaries ON job_facet_salaries(salary_currency, bucket_min);
+
+CREATE MATERIALIZED VIEW job_task_summaries AS
+SELECT
+    task_id,
+    COUNT(*) AS total_jobs,
+    COUNT(*) FILTER (WHERE canonical_job_id IS NOT NULL) AS duplicate_jobs,
+    COUNT(*) FILTER (WHERE embedding_status = 'SUCCESS') AS embedded_jobs,
+    COUNT(*) FILTER (WHERE embedding_status = 'FAILED') AS failed_jobs,
+    COUNT(DISTINCT location) AS distinct_locations,
+    COUNT(DISTINCT company) AS distinct_companies,
+    MIN(salary_min) AS salary_min,
+    MAX(salary_max) AS salary_max,
+    MAX(processed_at) AS last_processed_at
+FROM processed_jobs
+GROUP BY task_id;
+
+CREATE UNIQUE INDEX idx_job_task_summaries ON job_task_summaries(task_id);
+
 -- ========= TRIGGERS (REMOVED) =========
 -- NO TRIGGERS ARE CREATED IN THIS MINIMAL SCHEMA.
 -- Application code is fully responsible for managing 'updated_at',